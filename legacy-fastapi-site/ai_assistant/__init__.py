@@ -1,5 +1,5 @@
-from ai_assistant.agent import get_ai_response, sanitize_input
+from ai_assistant.agent import get_ai_response, stream_ai_response, sanitize_input
 from ai_assistant.session_store import session_store
 from ai_assistant.system_prompt import RAKIBUL_SYSTEM_PROMPT
 
-__all__ = ["get_ai_response", "sanitize_input", "session_store", "RAKIBUL_SYSTEM_PROMPT"]
+__all__ = ["get_ai_response", "stream_ai_response", "sanitize_input", "session_store", "RAKIBUL_SYSTEM_PROMPT"]
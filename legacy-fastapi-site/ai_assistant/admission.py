@@ -0,0 +1,251 @@
+"""
+Admission Control — rate limits and a global cap on in-flight LLM calls.
+
+Token buckets (RATE_LIMIT_* are "requests/seconds": a bucket holds up to
+`requests` tokens and refills at requests/seconds per second):
+  RATE_LIMIT_SESSION_IP   session creation per client IP   (default 10/60)
+  RATE_LIMIT_CHAT_IP      chat messages per client IP      (default 30/60)
+  RATE_LIMIT_CHAT_SESSION chat messages per session        (default 12/60)
+  TRUST_FORWARDED_FOR     key the per-IP buckets by X-Forwarded-For (default 0)
+
+The per-IP buckets key on the socket peer. Behind a proxy (Vercel, nginx)
+that is the proxy's address, so every visitor shares one session_ip and one
+chat_ip bucket: set TRUST_FORWARDED_FOR=1 there. Leave it off when clients
+connect directly, or anyone can pick their own key by sending the header.
+
+A chat message must fit both its IP and its session bucket, and the LLM
+queue must have room; if any check fails, no bucket is charged. A message
+turned away later (busy session, HTTP 409) is refunded.
+
+Bucket state is two floats per key in an LRU-bounded OrderedDict of at most
+RATE_LIMIT_MAX_KEYS entries per limiter, so memory stays flat however many
+addresses or sessions an attacker cycles through. An evicted key simply
+starts again with a full bucket.
+
+LLM admission: at most LLM_MAX_IN_FLIGHT chat turns call a provider at
+once. Up to LLM_MAX_QUEUE more wait (each for at most LLM_QUEUE_TIMEOUT
+seconds); beyond that, requests are turned away immediately. Cached answers
+never take a slot. LLM_MAX_IN_FLIGHT=0 removes the cap.
+
+Every rejection raises AdmissionRejected carrying a Retry-After hint; app.py
+turns it into HTTP 429.
+"""
+import os
+import math
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from core.metrics import metrics
+
+RATE_LIMIT_ENABLED      = os.getenv("RATE_LIMIT_ENABLED", "1") not in ("0", "false", "no")
+RATE_LIMIT_SESSION_IP   = os.getenv("RATE_LIMIT_SESSION_IP", "10/60")
+RATE_LIMIT_CHAT_IP      = os.getenv("RATE_LIMIT_CHAT_IP", "30/60")
+RATE_LIMIT_CHAT_SESSION = os.getenv("RATE_LIMIT_CHAT_SESSION", "12/60")
+RATE_LIMIT_MAX_KEYS     = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+LLM_MAX_IN_FLIGHT       = int(os.getenv("LLM_MAX_IN_FLIGHT", "32"))
+LLM_MAX_QUEUE           = int(os.getenv("LLM_MAX_QUEUE", "64"))
+LLM_QUEUE_TIMEOUT       = float(os.getenv("LLM_QUEUE_TIMEOUT", "15"))
+# Set to 1 behind Vercel or another proxy, else all clients share the proxy IP's buckets
+TRUST_FORWARDED_FOR     = os.getenv("TRUST_FORWARDED_FOR", "0") not in ("0", "false", "no")
+
+REJECTIONS = metrics.counter("admission_rejections_total", "Requests turned away with 429, by limit", ("limit",))
+
+
+class AdmissionRejected(Exception):
+    """Request refused by a rate limit or the LLM queue; retry after `retry_after` seconds."""
+
+    def __init__(self, limit: str, retry_after: float):
+        super().__init__(f"{limit} limit reached, retry after {retry_after:.1f}s")
+        self.limit = limit
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def _parse_rate(spec: str) -> tuple[float, float]:
+    """'30/60' → (capacity 30, refill 0.5 tokens per second)."""
+    count, _, seconds = spec.partition("/")
+    capacity = float(count)
+    return capacity, capacity / float(seconds or 1)
+
+
+class RateLimiter:
+    """Token buckets keyed by string, with LRU-bounded state."""
+
+    def __init__(self, name: str, spec: str, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.name = name
+        self.capacity, self.refill_rate = _parse_rate(spec)
+        self.max_keys = max_keys
+        # key → [tokens, last refill (monotonic)]
+        self._buckets: OrderedDict[str, list] = OrderedDict()
+        self.rejected = 0
+
+    def _bucket(self, key: str) -> list:
+        """The key's bucket, refilled up to now."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.capacity, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_rate)
+            bucket[1] = now
+        return bucket
+
+    def _reject(self, bucket: list, cost: float) -> AdmissionRejected:
+        self.rejected += 1
+        REJECTIONS.inc(self.name)
+        return AdmissionRejected(self.name, (cost - bucket[0]) / self.refill_rate)
+
+    def check(self, key: str, cost: float = 1.0):
+        """Take `cost` tokens from the key's bucket, or raise AdmissionRejected."""
+        take_all((self, key), cost=cost)
+
+    def refund(self, key: str, cost: float = 1.0):
+        """Give back tokens taken for a request that was turned away afterwards."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket[0] = min(self.capacity, bucket[0] + cost)
+
+    def stats(self) -> dict:
+        return {
+            "rate": f"{self.capacity:g}/{self.capacity / self.refill_rate:g}s",
+            "keys": len(self._buckets),
+            "rejected": self.rejected,
+        }
+
+
+def take_all(*checks: tuple[RateLimiter, str], cost: float = 1.0):
+    """
+    Take `cost` tokens from every (limiter, key) bucket, or from none: all are
+    checked before any is charged, so a rejection by one limit doesn't use
+    up the caller's allowance in the others.
+    """
+    buckets = [(limiter, limiter._bucket(key)) for limiter, key in checks]
+    for limiter, bucket in buckets:
+        if bucket[0] < cost:
+            raise limiter._reject(bucket, cost)
+    for _, bucket in buckets:
+        bucket[0] -= cost
+
+
+class LLMAdmission:
+    """Semaphore over provider calls with a bounded, time-limited wait queue."""
+
+    def __init__(
+        self,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        max_queue: int = LLM_MAX_QUEUE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def _reject(self) -> AdmissionRejected:
+        self.rejected += 1
+        REJECTIONS.inc("llm_queue")
+        return AdmissionRejected("llm_queue", self.queue_timeout / 2)
+
+    def check(self):
+        """Fast reject (before any work) when every slot and queue place is taken."""
+        if 0 < self.max_in_flight <= self.in_flight and self.waiting >= self.max_queue:
+            raise self._reject()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight LLM slot for the duration of the block."""
+        if self.max_in_flight <= 0:
+            yield
+            return
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()  # free slot: acquires without yielding
+        elif self.waiting >= self.max_queue:
+            raise self._reject()
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject()
+            finally:
+                self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionControl:
+    """The limits app.py applies, in one place."""
+
+    def __init__(self, enabled: bool = RATE_LIMIT_ENABLED):
+        self.enabled = enabled
+        self.session_ip = RateLimiter("session_ip", RATE_LIMIT_SESSION_IP)
+        self.chat_ip = RateLimiter("chat_ip", RATE_LIMIT_CHAT_IP)
+        self.chat_session = RateLimiter("chat_session", RATE_LIMIT_CHAT_SESSION)
+        self.llm = LLMAdmission()
+
+    @staticmethod
+    def client_ip(request) -> str:
+        if TRUST_FORWARDED_FOR:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    def check_session_create(self, ip: str):
+        if self.enabled:
+            self.session_ip.check(ip)
+
+    def check_chat(self, ip: str, session_id: str):
+        """Fast reject when the LLM queue is full, then the per-IP and per-session buckets."""
+        if not self.enabled:
+            return
+        self.llm.check()
+        take_all((self.chat_ip, ip), (self.chat_session, session_id))
+
+    def refund_chat(self, ip: str, session_id: str):
+        """Undo check_chat() for a message rejected after admission (busy session)."""
+        if self.enabled:
+            self.chat_ip.refund(ip)
+            self.chat_session.refund(session_id)
+
+    def stats(self) -> dict:
+        return {
+            "admission": {
+                "enabled": self.enabled,
+                "rate_limits": {
+                    limiter.name: limiter.stats()
+                    for limiter in (self.session_ip, self.chat_ip, self.chat_session)
+                },
+                "llm": self.llm.stats(),
+            }
+        }
+
+
+# Singleton instance — rate limits checked in app.py, LLM slots taken in agent.py
+admission = AdmissionControl()
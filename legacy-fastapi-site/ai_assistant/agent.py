@@ -8,10 +8,20 @@ Ollama setup:
   ollama pull qwen2.5
 """
 import os
+import json
+import time
+import asyncio
 import logging
-import aiohttp
+from typing import AsyncIterator
 
-from ai_assistant.system_prompt import RAKIBUL_SYSTEM_PROMPT
+from ai_assistant.admission import admission
+from ai_assistant.prompt_builder import build_system_prompt, tier_for_provider
+from ai_assistant.provider_router import ProvidersUnavailableError, provider_router
+from ai_assistant.response_cache import response_cache
+from ai_assistant.session_store import History
+from ai_assistant.tokens import estimate_message_tokens, estimate_tokens
+from core.clients import client_registry
+from core.metrics import LLM_BUCKETS, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -19,23 +29,64 @@ GROQ_MODEL   = "llama-3.3-70b-versatile"
 OLLAMA_HOST  = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen2.5")
 
+PROVIDER_LATENCY = metrics.histogram(
+    "llm_request_duration_seconds", "LLM provider call latency by outcome (ok, error, cancelled)",
+    ("provider", "outcome"), buckets=LLM_BUCKETS,
+)
+PROVIDER_ERRORS = metrics.counter("llm_errors_total", "Failed LLM provider calls", ("provider",))
+PROVIDER_FALLBACKS = metrics.counter(
+    "llm_fallbacks_total", "Answers served by a provider other than the first choice", ("provider",)
+)
+PROVIDER_TOKENS = metrics.counter(
+    "llm_tokens_total", "Estimated tokens sent to (in) and received from (out) each provider",
+    ("provider", "direction"),
+)
+
 
 # ── Message Builder ───────────────────────────────────────────────────────────
 
-def _build_messages(history: list[dict], user_message: str) -> list[dict]:
-    messages = [{"role": "system", "content": RAKIBUL_SYSTEM_PROMPT}]
-    messages.extend(history)
+def _build_messages(history: History, user_message: str, provider: str = "groq") -> list[dict]:
+    prompt = build_system_prompt(tier_for_provider(provider), query=user_message)
+    logger.debug(f"{provider} prompt: tier={prompt.tier} tokens≈{prompt.tokens} bytes={prompt.bytes}")
+
+    messages = [{"role": "system", "content": prompt.text}]
+    # The only place history is materialised as dicts (memory sessions store slotted Messages)
+    messages.extend(m if isinstance(m, dict) else m.as_dict() for m in history)
     messages.append({"role": "user", "content": user_message})
+    # Slotted Messages carry their token count; only Redis-backed dicts need estimating
+    history_tokens = sum(
+        estimate_message_tokens(m["content"]) if isinstance(m, dict) else m.tokens for m in history
+    )
+    PROVIDER_TOKENS.inc(
+        provider, "in",
+        amount=prompt.tokens + history_tokens + estimate_message_tokens(user_message),
+    )
     return messages
 
 
+async def _metered(provider: str, call, history: History, user_message: str) -> str:
+    """Run one non-streaming provider call, recording latency, errors and tokens."""
+    start = time.perf_counter()
+    try:
+        text = await call(_build_messages(history, user_message, provider))
+    except asyncio.CancelledError:
+        # Hedge loser: neither a success nor a provider failure
+        PROVIDER_LATENCY.observe(time.perf_counter() - start, provider, "cancelled")
+        raise
+    except Exception:
+        PROVIDER_LATENCY.observe(time.perf_counter() - start, provider, "error")
+        PROVIDER_ERRORS.inc(provider)
+        raise
+    PROVIDER_LATENCY.observe(time.perf_counter() - start, provider, "ok")
+    PROVIDER_TOKENS.inc(provider, "out", amount=estimate_tokens(text))
+    return text
+
+
 # ── Groq (Primary) ────────────────────────────────────────────────────────────
 
 async def _call_groq(messages: list[dict]) -> str:
     try:
-        from groq import AsyncGroq
-        client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
-        response = await client.chat.completions.create(
+        response = await client_registry.groq.chat.completions.create(
             model=GROQ_MODEL,
             messages=messages,
             max_tokens=1024,
@@ -43,8 +94,6 @@ async def _call_groq(messages: list[dict]) -> str:
             top_p=0.9,
         )
         return response.choices[0].message.content.strip()
-    except ImportError:
-        raise RuntimeError("groq package not installed. Run: pip install groq")
     except Exception as e:
         logger.warning(f"Groq call failed: {e}")
         raise
@@ -67,14 +116,15 @@ async def _call_ollama(messages: list[dict]) -> str:
             "num_predict": 1024,
         },
     }
+    import aiohttp  # deferred to the first Ollama call (cold start)
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise RuntimeError(f"Ollama returned {resp.status}: {text}")
-                data = await resp.json()
-                return data["message"]["content"].strip()
+        async with client_registry.http.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                raise RuntimeError(f"Ollama returned {resp.status}: {text}")
+            data = await resp.json()
+            return data["message"]["content"].strip()
     except aiohttp.ClientConnectorError:
         raise RuntimeError(
             f"Cannot reach Ollama at {OLLAMA_HOST}. "
@@ -85,47 +135,217 @@ async def _call_ollama(messages: list[dict]) -> str:
         raise
 
 
+# ── Streaming Variants ────────────────────────────────────────────────────────
+
+async def _stream_groq(messages: list[dict]) -> AsyncIterator[str]:
+    """Yield content deltas from Groq's streaming chat completion."""
+    stream = await client_registry.groq.chat.completions.create(
+        model=GROQ_MODEL,
+        messages=messages,
+        max_tokens=1024,
+        temperature=0.7,
+        top_p=0.9,
+        stream=True,
+    )
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+async def _stream_ollama(messages: list[dict]) -> AsyncIterator[str]:
+    """Yield content deltas from Ollama's NDJSON stream (`"stream": true`)."""
+    url = f"{OLLAMA_HOST}/api/chat"
+    payload = {
+        "model": OLLAMA_MODEL,
+        "messages": messages,
+        "stream": True,
+        "options": {
+            "temperature": 0.7,
+            "num_predict": 1024,
+        },
+    }
+    import aiohttp  # deferred to the first Ollama call (cold start)
+
+    try:
+        async with client_registry.http.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                raise RuntimeError(f"Ollama returned {resp.status}: {text}")
+            async for line in resp.content:
+                line = line.strip()
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Ollama stream error: {data['error']}")
+                delta = data.get("message", {}).get("content")
+                if delta:
+                    yield delta
+                if data.get("done"):
+                    break
+    except aiohttp.ClientConnectorError:
+        raise RuntimeError(
+            f"Cannot reach Ollama at {OLLAMA_HOST}. "
+            "Is it running? Try: ollama serve"
+        )
+
+
+async def stream_ai_response(
+    user_message: str,
+    history: History,
+    use_fallback: bool = True,
+) -> AsyncIterator[dict]:
+    """
+    Streaming counterpart of get_ai_response with the same Groq → Ollama chain.
+    A provider is only abandoned for the fallback if it fails before its first
+    token; a mid-stream failure ends the stream with an error event.
+    Circuit breakers are honoured, but streams are not hedged (tokens from two
+    providers cannot be merged once forwarded).
+
+    Yields:
+        {"type": "token", "content": str}
+        {"type": "done", "response": str, "provider": "groq"|"ollama"|"error", "error": str|None}
+    """
+    first_turn = not history
+    if first_turn:
+        cached = response_cache.get(user_message)
+        if cached is not None:
+            yield {"type": "token", "content": cached.response}
+            yield {"type": "done", "response": cached.response, "provider": cached.provider, "error": None}
+            return
+
+    providers = []
+    if os.getenv("GROQ_API_KEY"):
+        providers.append(("groq", _stream_groq))
+    if use_fallback:
+        providers.append(("ollama", _stream_ollama))
+
+    if not providers:
+        yield {
+            "type": "done",
+            "response": "No AI provider configured. Set GROQ_API_KEY or start Ollama locally.",
+            "provider": "error",
+            "error": "No providers available",
+        }
+        return
+
+    # Cached answers returned above never take an LLM slot
+    async with admission.llm.slot():
+        async for event in _stream_with_fallback(providers, history, user_message, first_turn):
+            yield event
+
+
+async def _stream_with_fallback(providers, history: History, user_message: str, first_turn: bool) -> AsyncIterator[dict]:
+    """The provider loop of stream_ai_response (runs while holding an LLM slot)."""
+    last_error = None
+    for name, stream_fn in providers:
+        breaker = provider_router.breaker(name)
+        if not breaker.allow():
+            last_error = ProvidersUnavailableError(f"{name} circuit open")
+            continue
+
+        parts: list[str] = []
+        start = time.perf_counter()
+        settled = False  # breaker told the outcome
+        try:
+            async for delta in stream_fn(_build_messages(history, user_message, name)):
+                parts.append(delta)
+                yield {"type": "token", "content": delta}
+        except Exception as e:
+            PROVIDER_LATENCY.observe(time.perf_counter() - start, name, "error")
+            PROVIDER_ERRORS.inc(name)
+            breaker.record_failure()
+            settled = True
+            last_error = e
+            if parts:
+                logger.error(f"{name} stream failed mid-response: {e}")
+                yield {"type": "done", "response": "".join(parts).strip(), "provider": name, "error": str(e)}
+                return
+            logger.warning(f"{name} stream failed before first token: {e}")
+            continue
+        else:
+            breaker.record_success()
+            settled = True
+        finally:
+            if not settled:
+                # Client went away (aclose / cancellation) mid-stream: no outcome, but
+                # a half-open probe must not stay in flight forever
+                PROVIDER_LATENCY.observe(time.perf_counter() - start, name, "cancelled")
+                breaker.release()
+
+        response = "".join(parts).strip()
+        PROVIDER_LATENCY.observe(time.perf_counter() - start, name, "ok")
+        PROVIDER_TOKENS.inc(name, "out", amount=estimate_tokens(response))
+        if name != providers[0][0]:
+            PROVIDER_FALLBACKS.inc(name)
+        if first_turn:
+            response_cache.put(user_message, response, name)
+        yield {"type": "done", "response": response, "provider": name, "error": None}
+        return
+
+    logger.error(f"All streaming providers failed: {last_error}")
+    yield {
+        "type": "done",
+        "response": "Both AI providers are currently unavailable. Please try again shortly.",
+        "provider": "error",
+        "error": str(last_error),
+    }
+
+
 # ── Main Entry Point ──────────────────────────────────────────────────────────
 
 async def get_ai_response(
     user_message: str,
-    history: list[dict],
+    history: History,
     use_fallback: bool = True,
 ) -> dict:
     """
     Get AI response with Groq → Ollama fallback chain.
+    Dispatch goes through provider_router: Ollama is raced against a slow Groq
+    call after the hedge delay, and providers with open circuits are skipped.
 
     Returns:
         {"response": str, "provider": "groq"|"ollama"|"error", "error": str|None}
     """
-    messages = _build_messages(history, user_message)
+    # ── First-turn answers are served from the response cache ──
+    first_turn = not history
+    if first_turn:
+        cached = response_cache.get(user_message)
+        if cached is not None:
+            return {"response": cached.response, "provider": cached.provider, "error": None}
 
-    # ── Try Groq first ──
+    calls = []
     if os.getenv("GROQ_API_KEY"):
-        try:
-            text = await _call_groq(messages)
-            return {"response": text, "provider": "groq", "error": None}
-        except Exception as e:
-            logger.warning(f"Groq failed, falling back to Ollama. Reason: {e}")
-
-    # ── Fallback to Ollama ──
+        calls.append(("groq", lambda: _metered("groq", _call_groq, history, user_message)))
     if use_fallback:
-        try:
-            text = await _call_ollama(messages)
-            return {"response": text, "provider": "ollama", "error": None}
-        except Exception as e:
-            logger.error(f"Ollama fallback failed: {e}")
-            return {
-                "response": "Both AI providers are currently unavailable. Please try again shortly.",
-                "provider": "error",
-                "error": str(e),
-            }
-
-    return {
-        "response": "No AI provider configured. Set GROQ_API_KEY or start Ollama locally.",
-        "provider": "error",
-        "error": "No providers available",
-    }
+        calls.append(("ollama", lambda: _metered("ollama", _call_ollama, history, user_message)))
+
+    if not calls:
+        return {
+            "response": "No AI provider configured. Set GROQ_API_KEY or start Ollama locally.",
+            "provider": "error",
+            "error": "No providers available",
+        }
+
+    try:
+        async with admission.llm.slot():
+            provider, text = await provider_router.dispatch(calls)
+    except ProvidersUnavailableError as e:
+        logger.error(f"All AI providers failed: {e}")
+        return {
+            "response": "Both AI providers are currently unavailable. Please try again shortly.",
+            "provider": "error",
+            "error": str(e),
+        }
+
+    if provider != calls[0][0]:
+        PROVIDER_FALLBACKS.inc(provider)
+    if first_turn:
+        response_cache.put(user_message, text, provider)
+    return {"response": text, "provider": provider, "error": None}
 
 
 # ── Input Sanitization ────────────────────────────────────────────────────────
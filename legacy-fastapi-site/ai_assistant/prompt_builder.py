@@ -0,0 +1,131 @@
+"""
+Prompt Builder — assembles the system prompt in size tiers.
+  full   RAKIBUL_SYSTEM_PROMPT as-is (persona, full portfolio JSON, all sections)
+  brief  RAKIBUL_BRIEF_CONTEXT + hard rules — for small local models where
+         prefill time dominates latency
+  rag    full prompt minus the embedded portfolio JSON, plus only the context
+         chunks retrieved for the current question
+
+Each provider gets its own tier (PROMPT_TIER_GROQ / PROMPT_TIER_OLLAMA), and
+every assembled prompt carries its estimated token and byte size. When the
+portfolio data is reloaded, set_portfolio_data() swaps the JSON embedded in
+the full tier.
+"""
+import os
+import json
+import logging
+from typing import Callable, NamedTuple, Optional
+
+from ai_assistant.system_prompt import RAKIBUL_BRIEF_CONTEXT, RAKIBUL_SYSTEM_PROMPT
+from ai_assistant.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TIERS = ("full", "brief", "rag")
+
+PROVIDER_PROMPT_TIERS = {
+    "groq": os.getenv("PROMPT_TIER_GROQ", "rag"),
+    "ollama": os.getenv("PROMPT_TIER_OLLAMA", "brief"),
+}
+
+
+class AssembledPrompt(NamedTuple):
+    text: str
+    tier: str
+    tokens: int
+    bytes: int
+
+
+def _assembled(text: str, tier: str) -> AssembledPrompt:
+    return AssembledPrompt(text, tier, estimate_tokens(text), len(text.encode("utf-8")))
+
+
+def _section(prompt: str, heading: str) -> str:
+    """Return one `## HEADING` section of the system prompt (up to the next `---`)."""
+    start = prompt.index(f"## {heading}")
+    end = prompt.find("\n---", start)
+    return prompt[start:] if end == -1 else prompt[start:end]
+
+
+def _portfolio_json_span(prompt: str) -> Optional[tuple[int, int]]:
+    """(start, end) of the embedded portfolio JSON block (a `{` … `}` pair at line start)."""
+    start = prompt.find("\n{\n")
+    end = prompt.find("\n}\n", start)
+    if start == -1 or end == -1:
+        return None
+    return start, end + 2
+
+
+def _strip_portfolio_json(prompt: str) -> str:
+    span = _portfolio_json_span(prompt)
+    if span is None:
+        return prompt
+    return prompt[:span[0]] + prompt[span[1]:]
+
+
+def _with_portfolio_json(prompt: str, data: dict) -> str:
+    """Replace the embedded portfolio JSON block with `data`."""
+    span = _portfolio_json_span(prompt)
+    if span is None:
+        return prompt
+    block = json.dumps(data, indent=4, ensure_ascii=False)
+    return f"{prompt[:span[0]]}\n{block}{prompt[span[1]:]}"
+
+
+_FULL = _assembled(RAKIBUL_SYSTEM_PROMPT, "full")
+_BRIEF = _assembled(
+    RAKIBUL_BRIEF_CONTEXT.strip() + "\n\n" + _section(RAKIBUL_SYSTEM_PROMPT, "HARD RULES").strip() + "\n",
+    "brief",
+)
+_RAG_BASE = _strip_portfolio_json(RAKIBUL_SYSTEM_PROMPT)
+
+# Retriever hook: (question, k) -> list of context chunks. Registered by the
+# retrieval layer; without one the rag tier degrades to the full prompt.
+_retriever: Optional[Callable[[str, int], list[str]]] = None
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+
+
+def set_retriever(retriever: Optional[Callable[[str, int], list[str]]]):
+    global _retriever
+    _retriever = retriever
+
+
+def set_portfolio_data(data: Optional[dict]):
+    """Rebuild the full tier around freshly loaded portfolio data (merge_data.json)."""
+    global _FULL
+    if not data:
+        return
+    _FULL = _assembled(_with_portfolio_json(RAKIBUL_SYSTEM_PROMPT, data), "full")
+
+
+def tier_for_provider(provider: str) -> str:
+    tier = PROVIDER_PROMPT_TIERS.get(provider, "full")
+    if tier not in PROMPT_TIERS:
+        logger.warning(f"Unknown prompt tier {tier!r} for {provider}, using 'full'")
+        return "full"
+    return tier
+
+
+def build_system_prompt(tier: str = "full", query: str = "") -> AssembledPrompt:
+    """Assemble the system prompt for a tier. `query` drives retrieval in the rag tier."""
+    if tier == "brief":
+        return _BRIEF
+    if tier == "rag":
+        if _retriever is None:
+            return _FULL
+        chunks = _retriever(query, RAG_TOP_K)
+        context = "\n\n".join(chunks) if chunks else "(no matching portfolio entries)"
+        text = f"{_RAG_BASE.rstrip()}\n\n## RETRIEVED PORTFOLIO CONTEXT\n\n{context}\n"
+        return _assembled(text, "rag")
+    return _FULL
+
+
+def prompt_sizes() -> dict:
+    """Token/byte size of the static tiers, for /api/chat/health."""
+    return {
+        "prompt_tiers": dict(PROVIDER_PROMPT_TIERS),
+        "prompt_sizes": {
+            prompt.tier: {"tokens": prompt.tokens, "bytes": prompt.bytes}
+            for prompt in (_FULL, _BRIEF)
+        },
+    }
@@ -0,0 +1,208 @@
+"""
+Provider Router — hedged dispatch across LLM providers with circuit breakers.
+
+Hedging: the primary provider gets a head start of `hedge delay` seconds. If
+it has not answered by then, the fallback is started too and whichever
+answer arrives first wins (the loser is cancelled). The delay is
+HEDGE_DELAY_SECONDS when set, otherwise the primary's observed p95 latency
+(clamped to HEDGE_MIN_DELAY..HEDGE_MAX_DELAY). HEDGE_ENABLED=0 restores the
+plain sequential fallback.
+
+Circuit breakers: after BREAKER_FAILURES consecutive failures a provider is
+skipped for BREAKER_RESET_SECONDS, then a single probe request is let
+through (half-open) to decide whether to close the breaker again.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+HEDGE_ENABLED         = os.getenv("HEDGE_ENABLED", "1") not in ("0", "false", "no")
+HEDGE_DELAY_SECONDS   = os.getenv("HEDGE_DELAY_SECONDS")
+HEDGE_MIN_DELAY       = float(os.getenv("HEDGE_MIN_DELAY", "1.0"))
+HEDGE_MAX_DELAY       = float(os.getenv("HEDGE_MAX_DELAY", "8.0"))
+BREAKER_FAILURES      = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+# Latency samples kept per provider for the p95 estimate
+LATENCY_WINDOW = 200
+# Samples needed before p95 replaces the default delay
+MIN_LATENCY_SAMPLES = 20
+
+
+class ProvidersUnavailableError(RuntimeError):
+    """Every candidate provider failed or has an open circuit."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → half-open (one probe) → closed."""
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Forget an in-flight probe that was cancelled without an outcome."""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "times_opened": self.times_opened}
+
+
+class ProviderRouter:
+
+    def __init__(self, hedge_enabled: bool = HEDGE_ENABLED, hedge_delay: Optional[str] = HEDGE_DELAY_SECONDS):
+        self.hedge_enabled = hedge_enabled
+        self.fixed_hedge_delay = float(hedge_delay) if hedge_delay else None
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self._latencies: dict[str, deque] = {}
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(provider)
+        return self.breakers[provider]
+
+    def record_latency(self, provider: str, seconds: float):
+        self._latencies.setdefault(provider, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def p95(self, provider: str) -> Optional[float]:
+        samples = self._latencies.get(provider)
+        if not samples or len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def hedge_delay(self, provider: str) -> float:
+        if self.fixed_hedge_delay is not None:
+            return self.fixed_hedge_delay
+        p95 = self.p95(provider)
+        if p95 is None:
+            return HEDGE_MAX_DELAY / 2
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, p95))
+
+    async def _timed(self, provider: str, call: Callable[[], Awaitable[str]]) -> str:
+        breaker = self.breaker(provider)
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except Exception:
+            breaker.record_failure()
+            raise
+        self.record_latency(provider, time.perf_counter() - start)
+        breaker.record_success()
+        return result
+
+    async def dispatch(self, calls: list[tuple[str, Callable[[], Awaitable[str]]]]) -> tuple[str, str]:
+        """
+        Run provider calls in priority order with hedging and breakers.
+        `calls` is [(provider_name, zero-arg coroutine factory), ...].
+        Returns (provider_name, text); raises ProvidersUnavailableError.
+        """
+        queue = list(calls)
+        pending: dict[asyncio.Task, str] = {}
+        hedged: set[str] = set()
+        last_error: Optional[Exception] = None
+
+        def launch() -> bool:
+            """Start the next provider whose breaker allows a call."""
+            while queue:
+                name, call = queue.pop(0)
+                breaker = self.breaker(name)
+                if breaker.allow():
+                    task = asyncio.create_task(self._timed(name, call))
+                    # A cancelled hedge loser has no outcome; free its half-open probe slot
+                    task.add_done_callback(lambda t, b=breaker: b.release() if t.cancelled() else None)
+                    pending[task] = name
+                    return True
+                logger.info(f"Skipping {name}: circuit open")
+            return False
+
+        if not launch():
+            raise ProvidersUnavailableError("All providers unavailable (circuits open)")
+
+        try:
+            while pending:
+                can_hedge = self.hedge_enabled and queue and len(pending) == 1
+                primary = next(iter(pending.values()))
+                timeout = self.hedge_delay(primary) if can_hedge else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Primary is slow, not failed — race the next provider against it
+                    if launch():
+                        hedge = list(pending.values())[-1]
+                        hedged.add(hedge)
+                        self.hedges_fired += 1
+                        logger.info(f"{primary} slower than {timeout:.2f}s, hedging with {hedge}")
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        if name in hedged:
+                            self.hedge_wins += 1
+                        return name, task.result()
+                    last_error = task.exception()
+                    logger.warning(f"{name} failed: {last_error}")
+
+                if not pending:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise ProvidersUnavailableError(str(last_error) if last_error else "All providers unavailable (circuits open)")
+
+    def stats(self) -> dict:
+        return {
+            "providers": {
+                name: {**breaker.stats(), "p95_seconds": self.p95(name)}
+                for name, breaker in self.breakers.items()
+            },
+            "hedging": {
+                "enabled": self.hedge_enabled,
+                "fired": self.hedges_fired,
+                "hedge_wins": self.hedge_wins,
+            },
+        }
+
+
+# Singleton instance — used by agent.py
+provider_router = ProviderRouter()
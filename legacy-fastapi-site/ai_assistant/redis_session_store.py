@@ -0,0 +1,160 @@
+"""
+Redis Session Store — sessions shared by every worker and container.
+Each session is two keys with a native TTL:
+  {prefix}{id}:meta      hash  created_at / last_active / message_count / history_tokens
+  {prefix}{id}:messages  list  JSON messages (with cached token counts), capped
+                               by max_messages and the history token budget
+A sorted set ({prefix}index, scored by last_active) enforces max_sessions
+with least-recently-active eviction, matching the in-memory store.
+
+Requires `pip install redis`. Works against any Redis-protocol server
+(redis-server, Valkey, KeyDB) or fakeredis in tests.
+"""
+import json
+import time
+import uuid
+
+from ai_assistant.session_store import (
+    HISTORY_TOKEN_BUDGET,
+    MAX_HISTORY_MESSAGES,
+    MAX_SESSIONS,
+    SESSION_TTL,
+    SessionBackend,
+)
+from ai_assistant.tokens import estimate_message_tokens
+
+
+class RedisSessionStore(SessionBackend):
+    """Redis-backed session store. `client` is a `redis.asyncio.Redis` (or fakeredis) instance."""
+
+    def __init__(
+        self,
+        client,
+        max_sessions: int = MAX_SESSIONS,
+        ttl_seconds: int = SESSION_TTL,
+        max_messages: int = MAX_HISTORY_MESSAGES,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        key_prefix: str = "rakibul:session:",
+    ):
+        self._redis = client
+        self.max_sessions = max_sessions
+        self.ttl = ttl_seconds
+        self.max_messages = max_messages
+        self.token_budget = token_budget
+        self.prefix = key_prefix
+        self._index_key = f"{key_prefix}index"
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSessionStore":
+        try:
+            from redis.asyncio import Redis
+        except ImportError:
+            raise RuntimeError("redis package not installed. Run: pip install redis")
+        return cls(Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def _meta_key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}:meta"
+
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}:messages"
+
+    async def create_session(self) -> str:
+        """Create a new session, return session_id."""
+        session_id = str(uuid.uuid4())
+        now = time.time()
+        await self._evict(now)
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._meta_key(session_id), mapping={
+                "created_at": now,
+                "last_active": now,
+                "message_count": 0,
+                "history_tokens": 0,
+            })
+            pipe.expire(self._meta_key(session_id), self.ttl)
+            pipe.zadd(self._index_key, {session_id: now})
+            await pipe.execute()
+        return session_id
+
+    async def get_history(self, session_id: str) -> list[dict]:
+        """Get conversation history for a session."""
+        raw = await self._redis.lrange(self._messages_key(session_id), 0, -1)
+        history = []
+        for item in raw:
+            message = json.loads(item)
+            history.append({"role": message["role"], "content": message["content"]})
+        return history
+
+    async def add_message(self, session_id: str, role: str, content: str) -> bool:
+        """
+        Append a message, trim to the token budget / max_messages and refresh
+        both TTLs. Returns False if session doesn't exist.
+        """
+        meta_key = self._meta_key(session_id)
+        messages_key = self._messages_key(session_id)
+        if not await self._redis.exists(meta_key):
+            return False
+
+        now = time.time()
+        tokens = estimate_message_tokens(content)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(messages_key, json.dumps({"role": role, "content": content, "tokens": tokens}))
+            pipe.hincrby(meta_key, "history_tokens", tokens)
+            pipe.expire(messages_key, self.ttl)
+            pipe.hset(meta_key, "last_active", now)
+            pipe.hincrby(meta_key, "message_count", 1)
+            pipe.expire(meta_key, self.ttl)
+            pipe.zadd(self._index_key, {session_id: now})
+            length, history_tokens, *_ = await pipe.execute()
+
+        await self._trim(session_id, length, history_tokens)
+        return True
+
+    async def _trim(self, session_id: str, length: int, history_tokens: int):
+        """
+        Pop the oldest messages while over budget, keeping user+assistant pairs
+        and the two most recent messages. Only the dropped head is read back.
+        """
+        meta_key = self._meta_key(session_id)
+        messages_key = self._messages_key(session_id)
+        while length > 2 and (history_tokens > self.token_budget or length > self.max_messages):
+            head = [json.loads(item) for item in await self._redis.lrange(messages_key, 0, 1)]
+            if not head:
+                break
+            pair = len(head) == 2 and head[0]["role"] == "user" and head[1]["role"] == "assistant"
+            dropped = head if pair else head[:1]
+            freed = sum(message["tokens"] for message in dropped)
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.lpop(messages_key, len(dropped))
+                pipe.hincrby(meta_key, "history_tokens", -freed)
+                _, history_tokens = await pipe.execute()
+            length -= len(dropped)
+
+    async def session_exists(self, session_id: str) -> bool:
+        return bool(await self._redis.exists(self._meta_key(session_id)))
+
+    async def _evict(self, now: float):
+        """Drop index entries past TTL, then the least recently active if at capacity."""
+        await self._redis.zremrangebyscore(self._index_key, "-inf", now - self.ttl)
+
+        overflow = await self._redis.zcard(self._index_key) - self.max_sessions + 1
+        if overflow <= 0:
+            return
+        evicted = await self._redis.zpopmin(self._index_key, overflow)
+        if evicted:
+            keys = []
+            for session_id, _ in evicted:
+                keys.extend((self._meta_key(session_id), self._messages_key(session_id)))
+            await self._redis.delete(*keys)
+
+    async def stats(self) -> dict:
+        """Return store statistics for monitoring."""
+        await self._redis.zremrangebyscore(self._index_key, "-inf", time.time() - self.ttl)
+        return {
+            "session_backend": "redis",
+            "active_sessions": await self._redis.zcard(self._index_key),
+            "max_sessions": self.max_sessions,
+        }
+
+    async def close(self):
+        await self._redis.aclose()
@@ -0,0 +1,159 @@
+"""
+Response Cache — reuse answers to repeated first-turn questions.
+Most visitors open with the same few questions ("what projects has he
+built", "contact info", "tech stack"). Only first-turn messages (empty
+history) are cached, since later answers depend on the conversation.
+
+Keys are normalised questions (lowercase, punctuation and extra whitespace
+removed). On an exact miss, an optional near-duplicate pass compares token
+sets (Jaccard similarity) against the cached questions. Those token sets keep
+negations and question words, which the search stopword list drops, and a
+near-duplicate must use exactly the same ones: "is he not available"
+never matches "is he available", and "why" never matches "how".
+
+Env:
+  RESPONSE_CACHE_SIZE         max entries, LRU-evicted         (default 256)
+  RESPONSE_CACHE_TTL          seconds an answer stays fresh     (default 21600)
+  RESPONSE_CACHE_SIMILARITY   near-duplicate threshold, 0 = off (default 0.85)
+  RESPONSE_CACHE_BYPASS       comma-separated providers whose answers are
+                              neither stored nor served, e.g. "ollama"
+"""
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from core.text import STOPWORDS
+
+RESPONSE_CACHE_SIZE       = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL        = float(os.getenv("RESPONSE_CACHE_TTL", str(6 * 3600)))
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.85"))
+RESPONSE_CACHE_BYPASS     = frozenset(
+    p.strip() for p in os.getenv("RESPONSE_CACHE_BYPASS", "").lower().split(",") if p.strip()
+)
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_TERM_RE = re.compile(r"[a-z0-9']+")
+
+NEGATIONS = frozenset({"not", "no", "never", "none", "nor", "neither", "without", "cannot"})
+QUESTION_WORDS = frozenset({"what", "why", "how", "who", "whom", "whose", "when", "where", "which"})
+# Words that change what is being asked: similarity keys keep them
+_MEANING_WORDS = NEGATIONS | QUESTION_WORDS
+_SIMILARITY_STOPWORDS = STOPWORDS - _MEANING_WORDS
+
+
+class CachedResponse(NamedTuple):
+    response: str
+    provider: str
+    expires_at: float
+    terms: frozenset
+    meaning: frozenset  # negation/question words in `terms`; must match exactly
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower()).split())
+
+
+def similarity_terms(text: str) -> frozenset:
+    """Token set for near-duplicate matching; contractions like "isn't" count as "not"."""
+    terms = set()
+    for word in _TERM_RE.findall(text.lower().replace("\u2019", "'")):
+        if word.endswith("n't"):
+            terms.add("not")
+            word = word[:-3]
+        word = word.strip("'")
+        if word and word not in _SIMILARITY_STOPWORDS:
+            terms.add(word)
+    return frozenset(terms)
+
+
+class ResponseCache:
+    """LRU + TTL cache of first-turn answers."""
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        ttl_seconds: float = RESPONSE_CACHE_TTL,
+        similarity: float = RESPONSE_CACHE_SIMILARITY,
+        bypass_providers: frozenset = RESPONSE_CACHE_BYPASS,
+    ):
+        self._store: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.similarity = similarity
+        self.bypass_providers = bypass_providers
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, question: str) -> Optional[CachedResponse]:
+        """Cached answer for a question, or None."""
+        key = normalize_question(question)
+        now = time.time()
+
+        entry = self._store.get(key)
+        if entry is not None and entry.expires_at > now and entry.provider not in self.bypass_providers:
+            self._store.move_to_end(key)
+            self.hits += 1
+            return entry
+        if entry is not None:
+            del self._store[key]
+
+        if self.similarity > 0:
+            match = self._nearest(question, now)
+            if match is not None:
+                self._store.move_to_end(match)
+                self.near_hits += 1
+                return self._store[match]
+
+        self.misses += 1
+        return None
+
+    def _nearest(self, question: str, now: float) -> Optional[str]:
+        terms = similarity_terms(question)
+        if not terms - _MEANING_WORDS:
+            return None
+        meaning = terms & _MEANING_WORDS
+        best_key, best_score = None, self.similarity
+        for cached_key, entry in self._store.items():
+            if entry.expires_at <= now or entry.provider in self.bypass_providers:
+                continue
+            if entry.meaning != meaning:
+                continue
+            union = len(terms | entry.terms)
+            score = len(terms & entry.terms) / union if union else 0.0
+            if score >= best_score:
+                best_key, best_score = cached_key, score
+        return best_key
+
+    def put(self, question: str, response: str, provider: str):
+        """Store an answer, unless it came from a bypassed provider or an error."""
+        if provider == "error" or provider in self.bypass_providers:
+            return
+        key = normalize_question(question)
+        if not key:
+            return
+        terms = similarity_terms(question)
+        self._store[key] = CachedResponse(response, provider, time.time() + self.ttl, terms, terms & _MEANING_WORDS)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    def clear(self):
+        self._store.clear()
+
+    def stats(self) -> dict:
+        return {
+            "response_cache": {
+                "entries": len(self._store),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "bypass_providers": sorted(self.bypass_providers),
+            }
+        }
+
+
+# Singleton instance — used by agent.py for first-turn messages
+response_cache = ResponseCache()
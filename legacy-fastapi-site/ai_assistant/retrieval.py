@@ -0,0 +1,144 @@
+"""
+Portfolio Retrieval — local BM25 index for grounding chat answers.
+Chunks static/utils/merge_data.json (profile, expertise, projects, skills,
+articles list) and the article pages under static/articles/, indexes them
+with core.bm25, and persists the index to disk keyed by source mtimes so
+restarts load it instead of rebuilding. The rag prompt tier injects the
+top-k chunks for each question instead of the whole portfolio JSON.
+"""
+import os
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from core.corpus import BASE_DIR, PersistedIndex, article_files, read_data
+from core.text import extract_html_text, tokenize
+
+if TYPE_CHECKING:
+    from core.bm25 import BM25Index  # NumPy-backed; imported on first load/build
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_INDEX_PATH = Path(os.getenv("RETRIEVAL_INDEX_PATH", BASE_DIR / ".cache" / "retrieval_index.npz"))
+
+# Words per article chunk
+ARTICLE_CHUNK_WORDS = 120
+
+
+def _portfolio_chunks(data: dict) -> list[str]:
+    chunks = []
+
+    social = ", ".join(
+        f"{link.get('label', name)}: {link.get('url', '')}"
+        for name, link in data.get("social", {}).items()
+    )
+    chunks.append(
+        f"Profile & contact — {data.get('name', '')}, {data.get('title', '')} ({data.get('location', '')}). "
+        f"{data.get('tagline', '')}\nEmail: {data.get('email', '')} | Phone: {data.get('phone', '')}\n"
+        f"Links: {social}"
+    )
+
+    about = data.get("about", {}).get("paragraphs", [])
+    if about:
+        chunks.append("About — " + " ".join(about))
+
+    stats = data.get("stats", [])
+    if stats:
+        chunks.append("Key stats — " + "; ".join(f"{s['number']} {s['label']}" for s in stats))
+
+    for item in data.get("expertise", []):
+        chunks.append(f"Expertise — {item['domain']}: {item['description']}")
+
+    for project in data.get("projects", []):
+        chunks.append(
+            f"Project — {project['title']} ({project.get('year', '')})\n"
+            f"Problem: {project.get('problem', '')}\n"
+            f"Solution: {project.get('solution', '')}\n"
+            f"Impact: {project.get('impact', '')}\n"
+            f"Stack: {', '.join(project.get('stack', []))}"
+        )
+
+    skills = data.get("skills", [])
+    if skills:
+        chunks.append("Skills (proficiency %) — " + ", ".join(f"{s['name']} ({s['level']})" for s in skills))
+
+    education = data.get("education")
+    if education:
+        chunks.append(
+            f"Education — {education.get('degree', '')}, {education.get('institution', '')} "
+            f"(CGPA {education.get('cgpa', '')})"
+        )
+
+    for article in data.get("articles", []):
+        chunks.append(
+            f"Article — \"{article['title']}\" ({article.get('category', '')}, {article.get('read_time', '')}): "
+            f"{article.get('description', '')} Read at /static/articles/{article['url']}"
+        )
+
+    if data.get("closing_statement"):
+        chunks.append("Philosophy — " + data["closing_statement"])
+    return chunks
+
+
+def _article_chunks(path: Path, titles: dict[str, str]) -> list[str]:
+    page = extract_html_text(path.read_text(encoding="utf-8"))
+    title = titles.get(path.name) or page.title or path.stem
+    chunks, window = [], []
+    for block in page.blocks:
+        window.extend(block.split())
+        if len(window) >= ARTICLE_CHUNK_WORDS:
+            chunks.append(f"From article \"{title}\": " + " ".join(window))
+            window = []
+    if window:
+        chunks.append(f"From article \"{title}\": " + " ".join(window))
+    return chunks
+
+
+class PortfolioRetriever(PersistedIndex):
+    """BM25 retriever over portfolio chunks; built or loaded once, then queried in-process."""
+
+    label = "Retrieval index"
+    items_key = "chunks"
+    unit = "chunks"
+
+    def __init__(self, index_path: Path = RETRIEVAL_INDEX_PATH):
+        super().__init__(index_path, "rakibul-retrieval")
+        self._chunks: list[str] = []
+
+    def rebuild(self, fingerprint: Optional[dict] = None, data: Optional[dict] = None):
+        """Re-chunk the sources, rebuild the index and try to persist it."""
+        self.install(*self.build(fingerprint, data))
+
+    def build(self, fingerprint: Optional[dict] = None, data: Optional[dict] = None) -> tuple["BM25Index", list[str]]:
+        """
+        Build (and persist) an index without touching the live one — safe to run
+        in a worker thread. `data` is already-parsed merge_data (e.g. from a hot
+        reload); install() the result to start serving it.
+        """
+        from core.bm25 import BM25Index
+
+        if data is None:
+            data = read_data()
+        titles = {article["url"]: article["title"] for article in data.get("articles", [])}
+
+        chunks = _portfolio_chunks(data)
+        for path in article_files():
+            chunks.extend(_article_chunks(path, titles))
+
+        index = BM25Index.build([tokenize(chunk) for chunk in chunks])
+        logger.info(f"Retrieval index built ({len(chunks)} chunks, {len(index.vocab)} terms)")
+        self._persist(index, chunks, fingerprint)
+        return index, chunks
+
+    def install(self, index: "BM25Index", chunks: list[str]):
+        self._index, self._chunks = index, chunks
+
+    def retrieve(self, query: str, k: int = 4) -> list[str]:
+        """Top-k chunks for a question ([] if nothing matches)."""
+        if self._index is None:
+            self.load_or_build()
+        return [self._chunks[doc_id] for doc_id, _ in self._index.search(tokenize(query), k)]
+
+
+# Singleton instance — loaded in the app lifespan and registered with prompt_builder
+portfolio_retriever = PortfolioRetriever()
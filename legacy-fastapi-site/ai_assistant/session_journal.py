@@ -0,0 +1,295 @@
+"""
+Session Journal — append-only on-disk log that lets the in-memory
+SessionStore survive restarts and deploys.
+
+Records are line-delimited JSON, one per event:
+  {"op": "c", "id": ..., "t": created}                        session created
+  {"op": "m", "id": ..., "r": role, "c": content, "t": time}  message added
+  {"op": "d", "id": ...}                                      session evicted
+  {"op": "s", "id": ..., "created", "active", "count", "messages": [[role, content], ...]}
+                                                              full session (written by compaction)
+
+The request path only appends to an in-memory buffer. A background task
+writes the buffer out every SESSION_JOURNAL_FLUSH seconds in one write +
+fsync, off the event loop. After SESSION_JOURNAL_COMPACT records, the file
+is rewritten as one "s" line per live session (atomic replace), so it stays
+proportional to what is actually in memory. A torn last line from a crash
+is skipped on replay. At most one flush interval of messages can be lost.
+
+Transcripts are private: journal and lock files are created 0600, and a
+journal not owned by this user is never replayed (it could inject forged
+history). If writes keep failing, the buffer is capped at
+SESSION_JOURNAL_MAX_PENDING records: past that it is dropped and the next
+successful write is a compaction, which captures the same state.
+
+In-memory sessions belong to one process, so each process owns its own
+journal file. At start, a process claims the first free slot, holding an
+fcntl lock on `<journal>.<n>.lock`. It then replays and writes only
+`sessions.journal` (slot 0) or `sessions.<n>.journal`. With `gunicorn -w 4`
+the workers end up with slots 0-3 again after a restart, so no two
+processes ever append to, or compact, the same file. Without fcntl
+(Windows), slot 0 is used unlocked.
+
+Env:
+  SESSION_JOURNAL             set to 0 to keep sessions in memory only
+  SESSION_JOURNAL_PATH        journal file       (default .cache/sessions.journal)
+  SESSION_JOURNAL_FLUSH       seconds between batched writes   (default 1)
+  SESSION_JOURNAL_COMPACT     records written between compactions (default 5000)
+  SESSION_JOURNAL_FSYNC       set to 0 to skip fsync after each batch
+  SESSION_JOURNAL_MAX_PENDING buffered records kept while writes fail (default 50000)
+"""
+import os
+import json
+import asyncio
+import logging
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+from core.storage import writable_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process, slot 0 unlocked
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SESSION_JOURNAL             = os.getenv("SESSION_JOURNAL", "1") not in ("0", "false", "no")
+SESSION_JOURNAL_PATH        = Path(os.getenv("SESSION_JOURNAL_PATH", BASE_DIR / ".cache" / "sessions.journal"))
+SESSION_JOURNAL_FLUSH       = float(os.getenv("SESSION_JOURNAL_FLUSH", "1"))
+SESSION_JOURNAL_COMPACT     = int(os.getenv("SESSION_JOURNAL_COMPACT", "5000"))
+SESSION_JOURNAL_FSYNC       = os.getenv("SESSION_JOURNAL_FSYNC", "1") not in ("0", "false", "no")
+SESSION_JOURNAL_MAX_PENDING = int(os.getenv("SESSION_JOURNAL_MAX_PENDING", "50000"))
+# Journal slots tried before giving up (more worker processes than this go unjournaled)
+MAX_SLOTS = 64
+
+
+def _open_private(path: Path, flags: int) -> BinaryIO:
+    """Open `path` for binary writing, creating it 0600 (and tightening an older file)."""
+    fd = os.open(path, flags | os.O_WRONLY | os.O_CREAT, 0o600)
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, 0o600)
+    return os.fdopen(fd, "ab" if flags & os.O_APPEND else "wb")
+
+
+def _owned_by_us(path: Path) -> bool:
+    return not hasattr(os, "getuid") or path.stat().st_uid == os.getuid()
+
+
+def _encode(records: list[dict]) -> bytes:
+    return "".join(
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records
+    ).encode("utf-8")
+
+
+class SessionJournal:
+    """
+    Buffered append-only journal. append() is called on the event loop and
+    never blocks; all file I/O happens in run()'s worker-thread hops, one at
+    a time, so the file handle needs no lock.
+    """
+
+    def __init__(
+        self,
+        path: Path = SESSION_JOURNAL_PATH,
+        flush_interval: float = SESSION_JOURNAL_FLUSH,
+        compact_every: int = SESSION_JOURNAL_COMPACT,
+        fsync: bool = SESSION_JOURNAL_FSYNC,
+        max_pending: int = SESSION_JOURNAL_MAX_PENDING,
+    ):
+        path = Path(path)
+        self.base_path = writable_dir(path.parent, "rakibul-sessions") / path.name
+        self.path: Optional[Path] = None  # set by claim()
+        self.slot: Optional[int] = None
+        self._lock_file: Optional[BinaryIO] = None
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.max_pending = max_pending
+        self._pending: list[dict] = []
+        # Set when buffered records were dropped: only a compaction can catch up
+        self._resync = False
+        self._file: Optional[BinaryIO] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.since_compaction = 0
+        self.flushes = 0
+        self.compactions = 0
+        self.records_written = 0
+        self.skipped_lines = 0
+        self.write_failures = 0
+        self.dropped_records = 0
+
+    def append(self, record: dict):
+        """Queue a record for the next batched write."""
+        if self.path is None:
+            return
+        if len(self._pending) >= self.max_pending:
+            # Writes keep failing: stop growing, the next compaction rewrites the state
+            self.dropped_records += len(self._pending)
+            self._pending.clear()
+            self._resync = True
+        self._pending.append(record)
+
+    def _slot_path(self, slot: int) -> Path:
+        if slot == 0:
+            return self.base_path
+        return self.base_path.with_name(f"{self.base_path.stem}.{slot}{self.base_path.suffix}")
+
+    def claim(self) -> bool:
+        """
+        Take the first journal slot no other process holds (blocking: call via
+        a thread). Returns False if every slot is taken; the journal then stays off.
+        """
+        if self.path is not None:
+            return True
+        if fcntl is None:
+            self.slot, self.path = 0, self.base_path
+            return True
+        for slot in range(MAX_SLOTS):
+            lock_file = _open_private(self.base_path.with_name(f"{self.base_path.name}.{slot}.lock"), os.O_APPEND)
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self._lock_file, self.slot, self.path = lock_file, slot, self._slot_path(slot)
+            return True
+        logger.warning(f"Session journal: all {MAX_SLOTS} slots in use, sessions will not be persisted")
+        return False
+
+    def _release(self):
+        if self._lock_file is not None:
+            self._lock_file.close()  # drops the flock
+            self._lock_file = None
+        self.path = None
+
+    # ── Replay ────────────────────────────────────────────────────────────────
+
+    def read(self) -> list[dict]:
+        """All readable records of the claimed slot, oldest first (blocking: call via a thread)."""
+        if self.path is None or not self.path.exists():
+            return []
+        if not _owned_by_us(self.path):
+            logger.warning(f"Session journal: {self.path} belongs to another user, not replaying it")
+            return []
+        records = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Torn write at crash time (or corruption): skip the line
+                    self.skipped_lines += 1
+        if self.skipped_lines:
+            logger.warning(f"Session journal: skipped {self.skipped_lines} unreadable lines in {self.path}")
+        return records
+
+    # ── Writing (worker thread) ───────────────────────────────────────────────
+
+    def _write(self, data: bytes):
+        if self._file is None:
+            self._file = _open_private(self.path, os.O_APPEND)
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _rewrite(self, data: bytes):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with _open_private(tmp, os.O_TRUNC) as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp.replace(self.path)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ── Background task ───────────────────────────────────────────────────────
+
+    async def flush(self):
+        """Write out everything appended so far."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self._write, _encode(batch))
+        except OSError as e:
+            # Keep the batch for the next attempt rather than dropping it
+            self._pending[:0] = batch
+            self.write_failures += 1
+            logger.error(f"Session journal write failed: {e}")
+            return
+        self.flushes += 1
+        self.records_written += len(batch)
+        self.since_compaction += len(batch)
+
+    async def compact(self, snapshot: list[dict]):
+        """
+        Replace the journal with `snapshot` (the live sessions, taken on the
+        loop). Records buffered before the snapshot are already reflected in
+        it and are dropped once the rewrite succeeds; if it fails they stay
+        buffered for the old file.
+        """
+        covered = len(self._pending)
+        try:
+            await asyncio.to_thread(self._rewrite, _encode(snapshot))
+        except OSError as e:
+            self.write_failures += 1
+            logger.error(f"Session journal compaction failed: {e}")
+            return
+        del self._pending[:covered]
+        self._resync = False
+        self.compactions += 1
+        self.since_compaction = 0
+        logger.debug(f"Session journal compacted to {len(snapshot)} sessions")
+
+    async def _run(self, snapshot: Callable[[], list[dict]]):
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if self._resync or self.since_compaction + len(self._pending) >= self.compact_every:
+                    await self.compact(snapshot())
+                else:
+                    await self.flush()
+            except Exception as e:
+                logger.error(f"Session journal task failed: {e}")
+        await self.flush()
+        await asyncio.to_thread(self._close_file)
+        self._release()
+
+    def start(self, snapshot: Callable[[], list[dict]]):
+        """Start the background writer. `snapshot()` returns the records compaction writes."""
+        if self.path is not None and (self._task is None or self._task.done()):
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self._run(snapshot))
+
+    async def close(self):
+        """Flush what is buffered and stop the writer (no thread is left mid-write)."""
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path) if self.path is not None else None,
+            "slot": self.slot,
+            "pending": len(self._pending),
+            "records_written": self.records_written,
+            "flushes": self.flushes,
+            "compactions": self.compactions,
+            "write_failures": self.write_failures,
+            "dropped_records": self.dropped_records,
+        }
@@ -0,0 +1,82 @@
+"""
+Session Locks — serialise the read → generate → append cycle per session.
+Without this, two messages on the same session can both read the same
+history, call the LLM in parallel and append their turns interleaved.
+
+Policy for a second in-flight request on a busy session (SESSION_CONCURRENCY):
+  queue   (default) wait for the first turn to finish, up to SESSION_LOCK_TIMEOUT
+  reject  fail immediately with SessionBusyError (HTTP 409 in app.py)
+
+Locks are per-process asyncio locks; with several workers sharing a Redis
+session backend they still serialise requests routed to the same worker.
+"""
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+SESSION_CONCURRENCY  = os.getenv("SESSION_CONCURRENCY", "queue").lower()
+SESSION_LOCK_TIMEOUT = float(os.getenv("SESSION_LOCK_TIMEOUT", "90"))
+
+
+class SessionBusyError(Exception):
+    """Another request is already generating a reply for this session."""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Session {session_id} already has a request in flight")
+        self.session_id = session_id
+
+
+class SessionLocks:
+    """Lazily created asyncio.Lock per session, dropped once nobody holds or waits on it."""
+
+    def __init__(self, mode: str = SESSION_CONCURRENCY, timeout: float = SESSION_LOCK_TIMEOUT):
+        if mode not in ("queue", "reject"):
+            raise ValueError(f"Unknown SESSION_CONCURRENCY: {mode!r} (expected 'queue' or 'reject')")
+        self.mode = mode
+        self.timeout = timeout
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._refs: dict[str, int] = {}
+        self.rejected = 0
+
+    def is_busy(self, session_id: str) -> bool:
+        lock = self._locks.get(session_id)
+        return lock is not None and lock.locked()
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        """Hold the session's lock for the duration of the block."""
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._refs[session_id] = self._refs.get(session_id, 0) + 1
+        try:
+            if not lock.locked():
+                await lock.acquire()  # uncontended: acquires without yielding
+            elif self.mode == "reject":
+                self.rejected += 1
+                raise SessionBusyError(session_id)
+            else:
+                try:
+                    await asyncio.wait_for(lock.acquire(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    self.rejected += 1
+                    raise SessionBusyError(session_id)
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            self._refs[session_id] -= 1
+            if not self._refs[session_id]:
+                del self._refs[session_id]
+                del self._locks[session_id]
+
+    def stats(self) -> dict:
+        return {
+            "session_concurrency": self.mode,
+            "sessions_in_flight": sum(1 for lock in self._locks.values() if lock.locked()),
+            "busy_rejections": self.rejected,
+        }
+
+
+# Singleton instance — imported by app.py
+session_locks = SessionLocks()
@@ -0,0 +1,104 @@
+"""
+Session Model — compact in-memory representation for SessionStore.
+A session used to be a dict holding deques of {"role", "content"} dicts,
+so every message paid for a dict plus two key slots, and its token count
+lived in a parallel deque. `Message` and `Session` are __slots__ classes
+instead. Roles are small ints (`Role`), and the token count sits on the
+message.
+
+Content of older messages can be kept zlib-compressed: once a message is
+more than SESSION_COMPRESS_AFTER messages from the end of the history, it
+is compressed if it is at least SESSION_COMPRESS_MIN_BYTES long and
+compression actually saves space. The newest messages, which are the ones
+read most, stay as plain str. Provider-facing dicts are only built by
+`Message.as_dict()` when a prompt is assembled.
+
+Env:
+  SESSION_COMPRESS            set to 0 to keep all content uncompressed
+  SESSION_COMPRESS_AFTER      newest messages kept uncompressed (default 4)
+  SESSION_COMPRESS_MIN_BYTES  smallest content worth compressing (default 512)
+"""
+import os
+import zlib
+from collections import deque
+from enum import IntEnum
+from typing import Union
+
+SESSION_COMPRESS           = os.getenv("SESSION_COMPRESS", "1") not in ("0", "false", "no")
+SESSION_COMPRESS_AFTER     = int(os.getenv("SESSION_COMPRESS_AFTER", "4"))
+SESSION_COMPRESS_MIN_BYTES = int(os.getenv("SESSION_COMPRESS_MIN_BYTES", "512"))
+
+
+class Role(IntEnum):
+    SYSTEM = 0
+    USER = 1
+    ASSISTANT = 2
+
+
+# Indexed by Role value; the strings providers expect
+ROLE_NAMES = ("system", "user", "assistant")
+ROLES = {name: Role(i) for i, name in enumerate(ROLE_NAMES)}
+
+
+class Message:
+    """One history entry. `_content` is a str, or zlib-compressed UTF-8 bytes."""
+
+    __slots__ = ("role", "_content", "tokens")
+
+    def __init__(self, role: int, content: str, tokens: int):
+        self.role = int(role)  # plain int: small ints are shared, an enum member is not needed per message
+        self._content: Union[str, bytes] = content
+        self.tokens = tokens
+
+    @property
+    def content(self) -> str:
+        content = self._content
+        if isinstance(content, bytes):
+            return zlib.decompress(content).decode("utf-8")
+        return content
+
+    @property
+    def role_name(self) -> str:
+        return ROLE_NAMES[self.role]
+
+    @property
+    def compressed(self) -> bool:
+        return isinstance(self._content, bytes)
+
+    def compress(self, min_bytes: int = SESSION_COMPRESS_MIN_BYTES):
+        """Keep the content compressed if it is long enough and compression pays off."""
+        content = self._content
+        if isinstance(content, bytes) or len(content) < min_bytes:
+            return
+        raw = content.encode("utf-8")
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            self._content = packed
+
+    def as_dict(self) -> dict:
+        """The {"role", "content"} view sent to providers."""
+        return {"role": ROLE_NAMES[self.role], "content": self.content}
+
+
+class Session:
+    __slots__ = ("messages", "history_tokens", "created_at", "last_active", "message_count")
+
+    def __init__(self, created_at: float):
+        self.messages: deque[Message] = deque()
+        self.history_tokens = 0
+        self.created_at = created_at
+        self.last_active = created_at
+        self.message_count = 0
+
+    def append(self, message: Message, compress_after: int = SESSION_COMPRESS_AFTER):
+        """Add a message and, if enabled, compress the one that just aged past `compress_after`."""
+        self.messages.append(message)
+        self.history_tokens += message.tokens
+        self.message_count += 1
+        if SESSION_COMPRESS and len(self.messages) > compress_after:
+            self.messages[-compress_after - 1].compress()
+
+    def popleft(self) -> Message:
+        message = self.messages.popleft()
+        self.history_tokens -= message.tokens
+        return message
@@ -1,24 +1,92 @@
 """
-Session Store — In-memory conversation history per session.
-Production note: swap `_store` with Redis for multi-instance deployments.
+Session Store — conversation history per session.
+`SessionBackend` is the async interface app.py talks to. `SessionStore` is the
+in-memory implementation (single process); `RedisSessionStore` shares sessions
+across workers/containers. Pick one with SESSION_BACKEND=memory|redis.
+The memory backend keeps sessions as ai_assistant.session_model objects and
+survives restarts through ai_assistant.session_journal.
 """
+import os
 import time
 import uuid
-from typing import Optional
+import heapq
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence, Union
 from collections import OrderedDict
 
-# Max messages to keep per session (controls context window size)
+from ai_assistant.session_journal import SESSION_JOURNAL, SessionJournal
+from ai_assistant.session_model import ROLE_NAMES, ROLES, Message, Role, Session
+from ai_assistant.tokens import estimate_message_tokens
+
+logger = logging.getLogger(__name__)
+
+# Max messages to keep per session (hard cap on top of the token budget)
 MAX_HISTORY_MESSAGES = 20
+# Max estimated tokens of history sent with each turn (controls context window size)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000"))
 # Session TTL in seconds (1 hour)
 SESSION_TTL = 3600
 # Max concurrent sessions (prevents memory bloat)
 MAX_SESSIONS = 500
+# Seconds between background TTL sweeps
+SWEEP_INTERVAL = 60
+
+# What get_history returns: Message objects (memory) or {"role", "content"} dicts (Redis)
+History = Sequence[Union[Message, dict]]
+
+
+class SessionBackend(ABC):
+    """Async interface every session backend implements."""
+
+    max_sessions: int
+    ttl: int
+    max_messages: int
+    token_budget: int
+
+    @abstractmethod
+    async def create_session(self) -> str:
+        """Create a new session, return session_id."""
+
+    @abstractmethod
+    async def get_history(self, session_id: str) -> History:
+        """Get conversation history for a session ([] if expired/missing)."""
+
+    @abstractmethod
+    async def add_message(self, session_id: str, role: str, content: str) -> bool:
+        """Append a message. Returns False if the session doesn't exist."""
 
+    @abstractmethod
+    async def session_exists(self, session_id: str) -> bool:
+        """True if the session exists and has not expired."""
 
-class SessionStore:
+    @abstractmethod
+    async def stats(self) -> dict:
+        """Return store statistics for monitoring."""
+
+    async def start(self):
+        """Start background work (sweepers, connections). Called from the app lifespan."""
+
+    async def close(self):
+        """Release backend resources (connections, tasks)."""
+
+
+class SessionStore(SessionBackend):
     """
-    Thread-safe in-memory session store with LRU eviction and TTL.
-    For production: replace with Redis + asyncio-redis.
+    In-memory session store with LRU eviction and TTL.
+    Sessions live in this process only — use RedisSessionStore when running
+    more than one worker or container.
+
+    Expiry is tracked in a min-heap of (deadline, session_id) with lazy
+    deletion: each live session has one entry, and activity does not touch
+    the heap. When an entry surfaces whose session has since been active,
+    it is re-pushed with the real deadline; entries for deleted sessions
+    are dropped. Eviction therefore only touches expired sessions instead
+    of scanning the whole store.
+
+    With a `journal`, every change is also queued to the on-disk journal,
+    and start() replays it, so sessions survive a restart.
     """
 
     def __init__(
@@ -26,30 +94,44 @@ class SessionStore:
         max_sessions: int = MAX_SESSIONS,
         ttl_seconds: int = SESSION_TTL,
         max_messages: int = MAX_HISTORY_MESSAGES,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        sweep_interval: float = SWEEP_INTERVAL,
+        journal: Optional[SessionJournal] = None,
     ):
-        self._store: OrderedDict[str, dict] = OrderedDict()
+        self._store: OrderedDict[str, Session] = OrderedDict()
+        self._expiry: list[tuple[float, str]] = []
+        self._sweeper: Optional[asyncio.Task] = None
         self.max_sessions = max_sessions
         self.ttl = ttl_seconds
         self.max_messages = max_messages
+        self.token_budget = token_budget
+        self.sweep_interval = sweep_interval
+        self.journal = journal
+        self.expired_evictions = 0
+        self.lru_evictions = 0
+        self.restored_sessions = 0
 
-    def create_session(self) -> str:
+    async def create_session(self) -> str:
         """Create a new session, return session_id."""
         session_id = str(uuid.uuid4())
         self._evict_expired()
 
         # LRU eviction if at capacity
         if len(self._store) >= self.max_sessions:
-            self._store.popitem(last=False)
+            evicted_id, _ = self._store.popitem(last=False)
+            self.lru_evictions += 1
+            if self.journal:
+                self.journal.append({"op": "d", "id": evicted_id})
 
-        self._store[session_id] = {
-            "messages": [],
-            "created_at": time.time(),
-            "last_active": time.time(),
-            "message_count": 0,
-        }
+        now = time.time()
+        self._store[session_id] = Session(now)
+        heapq.heappush(self._expiry, (now + self.ttl, session_id))
+        self._compact_expiry()
+        if self.journal:
+            self.journal.append({"op": "c", "id": session_id, "t": now})
         return session_id
 
-    def get_session(self, session_id: str) -> Optional[dict]:
+    def get_session(self, session_id: str) -> Optional[Session]:
         """Retrieve session data, None if expired/missing."""
         if session_id not in self._store:
             return None
@@ -57,22 +139,23 @@ class SessionStore:
         session = self._store[session_id]
 
         # TTL check
-        if time.time() - session["last_active"] > self.ttl:
+        if time.time() - session.last_active > self.ttl:
             del self._store[session_id]
+            self.expired_evictions += 1
             return None
 
         # Move to end (LRU update)
         self._store.move_to_end(session_id)
         return session
 
-    def get_history(self, session_id: str) -> list[dict]:
-        """Get conversation history for a session."""
+    async def get_history(self, session_id: str) -> list[Message]:
+        """Get conversation history for a session (dicts are only built for the provider call)."""
         session = self.get_session(session_id)
         if not session:
             return []
-        return session["messages"]
+        return list(session.messages)
 
-    def add_message(self, session_id: str, role: str, content: str) -> bool:
+    async def add_message(self, session_id: str, role: str, content: str) -> bool:
         """
         Add a message to session history.
         role: 'user' | 'assistant'
@@ -82,40 +165,174 @@ class SessionStore:
         if not session:
             return False
 
-        session["messages"].append({"role": role, "content": content})
-        session["last_active"] = time.time()
-        session["message_count"] += 1
+        now = time.time()
+        self._append(session, role, content, now)
+        if self.journal:
+            self.journal.append({"op": "m", "id": session_id, "r": role, "c": content, "t": now})
+        return True
 
-        # Trim history: keep system context + recent messages
-        # Always keep pairs (user+assistant) so we don't break context
-        if len(session["messages"]) > self.max_messages:
-            # Drop oldest pair
-            session["messages"] = session["messages"][-self.max_messages :]
+    def _append(self, session: Session, role: str, content: str, at: float):
+        session.append(Message(ROLES[role], content, estimate_message_tokens(content)))
+        session.last_active = at
+        self._trim(session)
 
-        return True
+    def _trim(self, session: Session):
+        """
+        Drop the oldest messages until history fits the token budget and the
+        message cap. Token counts are cached per message, so each drop is O(1).
+        Always keep pairs (user+assistant) so we don't break context, and never
+        trim below the two most recent messages.
+        """
+        messages = session.messages
+        while len(messages) > 2 and (
+            session.history_tokens > self.token_budget
+            or len(messages) > self.max_messages
+        ):
+            pair = messages[0].role == Role.USER and messages[1].role == Role.ASSISTANT
+            for _ in range(2 if pair else 1):
+                session.popleft()
 
-    def session_exists(self, session_id: str) -> bool:
+    async def session_exists(self, session_id: str) -> bool:
         session = self.get_session(session_id)
         return session is not None
 
-    def _evict_expired(self):
-        """Remove sessions past TTL."""
+    def _evict_expired(self) -> int:
+        """Pop due heap entries and remove the sessions that really are past TTL."""
         now = time.time()
-        expired = [
-            sid
-            for sid, data in self._store.items()
-            if now - data["last_active"] > self.ttl
+        evicted = 0
+        while self._expiry and self._expiry[0][0] < now:
+            _, sid = heapq.heappop(self._expiry)
+            session = self._store.get(sid)
+            if session is None:
+                continue  # already removed (LRU, TTL check in get_session)
+
+            deadline = session.last_active + self.ttl
+            if deadline < now:
+                del self._store[sid]
+                evicted += 1
+            else:
+                heapq.heappush(self._expiry, (deadline, sid))
+
+        self.expired_evictions += evicted
+        return evicted
+
+    def _compact_expiry(self):
+        """Rebuild the heap when orphaned entries (LRU-evicted sessions) pile up."""
+        if len(self._expiry) > 2 * max(len(self._store), self.max_sessions):
+            self._expiry = [
+                (session.last_active + self.ttl, sid)
+                for sid, session in self._store.items()
+            ]
+            heapq.heapify(self._expiry)
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                evicted = self._evict_expired()
+                if evicted:
+                    logger.debug(f"Session sweeper evicted {evicted} expired sessions")
+            except Exception as e:
+                logger.error(f"Session sweeper failed: {e}")
+
+    # ── Journal ───────────────────────────────────────────────────────────────
+
+    def _replay(self, records: list[dict]) -> int:
+        """Rebuild sessions from journal records, skipping expired ones. Returns the number restored."""
+        restored: dict[str, Session] = {}
+        for record in records:
+            op, sid = record.get("op"), record.get("id")
+            if op == "c":
+                restored[sid] = Session(record["t"])
+            elif op == "m" and sid in restored:
+                self._append(restored[sid], record["r"], record["c"], record["t"])
+            elif op == "s":
+                session = restored[sid] = Session(record["created"])
+                for role, content in record["messages"]:
+                    self._append(session, role, content, record["active"])
+                session.message_count = record["count"]
+            elif op == "d":
+                restored.pop(sid, None)
+
+        now = time.time()
+        live = sorted(
+            ((sid, session) for sid, session in restored.items() if now - session.last_active <= self.ttl),
+            key=lambda item: item[1].last_active,
+        )[-self.max_sessions:]
+        for sid, session in live:
+            self._store[sid] = session
+            self._store.move_to_end(sid)
+        self._expiry = [(session.last_active + self.ttl, sid) for sid, session in self._store.items()]
+        heapq.heapify(self._expiry)
+        return len(live)
+
+    def _snapshot(self) -> list[dict]:
+        """One compaction record per live session, least recently used first."""
+        return [
+            {
+                "op": "s",
+                "id": sid,
+                "created": session.created_at,
+                "active": session.last_active,
+                "count": session.message_count,
+                "messages": [[ROLE_NAMES[m.role], m.content] for m in session.messages],
+            }
+            for sid, session in self._store.items()
         ]
-        for sid in expired:
-            del self._store[sid]
 
-    def stats(self) -> dict:
+    async def start(self):
+        """Replay the journal (if any), then start the TTL sweeper and journal writer."""
+        if self.journal and (self._sweeper is None or self._sweeper.done()):
+            await asyncio.to_thread(self.journal.claim)
+            records = await asyncio.to_thread(self.journal.read)
+            self.restored_sessions = self._replay(records)
+            if records:
+                logger.info(f"Session journal: restored {self.restored_sessions} sessions from {self.journal.path}")
+                # Start from a compacted journal: drops expired and evicted sessions
+                await self.journal.compact(self._snapshot())
+            self.journal.start(self._snapshot)
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def close(self):
+        """Stop the background TTL sweeper and flush the journal."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        if self.journal:
+            await self.journal.close()
+
+    async def stats(self) -> dict:
         """Return store statistics for monitoring."""
         return {
+            "session_backend": "memory",
             "active_sessions": len(self._store),
             "max_sessions": self.max_sessions,
+            "expired_evictions": self.expired_evictions,
+            "lru_evictions": self.lru_evictions,
+            "restored_sessions": self.restored_sessions,
+            "journal": self.journal.stats() if self.journal else None,
         }
 
 
+def create_session_store() -> SessionBackend:
+    """
+    Build the backend selected by env:
+      SESSION_BACKEND=memory (default) | redis
+      REDIS_URL=redis://localhost:6379/0
+    """
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    if backend == "redis":
+        from ai_assistant.redis_session_store import RedisSessionStore
+        return RedisSessionStore.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend!r} (expected 'memory' or 'redis')")
+    return SessionStore(journal=SessionJournal() if SESSION_JOURNAL else None)
+
+
 # Singleton instance — imported by app.py
-session_store = SessionStore()
+session_store = create_session_store()
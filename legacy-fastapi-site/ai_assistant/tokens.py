@@ -0,0 +1,24 @@
+"""
+Token Estimator — cheap, dependency-free token counts for budgeting.
+Splits text into word pieces of up to 4 characters plus individual
+punctuation marks, which tracks BPE tokenizers (Llama/Qwen) closely enough
+for trimming history and sizing prompts without loading a real tokenizer.
+"""
+import re
+
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+# Per-message framing overhead (role markers, separators) in chat templates
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a string."""
+    if not text:
+        return 0
+    return len(_TOKEN_RE.findall(text))
+
+
+def estimate_message_tokens(content: str) -> int:
+    """Approximate tokens one chat message costs, including framing."""
+    return estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
@@ -1,21 +1,35 @@
+from coldstart import coldstart_profiler  # keep first: times the imports below when COLDSTART_PROFILE=1
+
 import os
+import json
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-import markdown
-import aiofiles
 import dotenv
 
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
 
 from tools import MyTools
-from ai_assistant.agent import get_ai_response, sanitize_input
+from ai_assistant.admission import AdmissionRejected, admission
+from ai_assistant.agent import get_ai_response, stream_ai_response, sanitize_input
 from ai_assistant.session_store import session_store
+from ai_assistant.prompt_builder import prompt_sizes, set_portfolio_data, set_retriever
+from ai_assistant.provider_router import provider_router
+from ai_assistant.response_cache import response_cache
+from ai_assistant.retrieval import portfolio_retriever
+from ai_assistant.session_locks import SessionBusyError, session_locks
+from core import article_cache, choose_encoding, client_registry, etag_matches, is_not_modified
+from core.assets import CachedStaticFiles, PrecompressedStaticFiles, asset_pipeline
+from core.data_provider import DataProvider
+from core.images import image_derivatives
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_ENABLED, MetricsMiddleware, metrics
+from core.pages import PageCache
+from core.search import article_search
 
 dotenv.load_dotenv()
 
@@ -23,9 +37,37 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+async def _warm_caches():
+    """
+    Background warm-up started by the lifespan. Every step runs in a worker
+    thread; until a step finishes, its cache builds on demand (home page,
+    articles) or the chat falls back to the full prompt (retrieval).
+    """
+    try:
+        await home_page.warm()
+        compiled = await article_cache.warm()
+        logger.info(f"✅ Articles: {compiled} pre-rendered")
+    except Exception as e:
+        logger.warning(f"⚠️  Page warm-up failed, rendering on demand — {e}")
+
+    try:
+        chunks = await asyncio.to_thread(portfolio_retriever.load_or_build)
+        set_retriever(portfolio_retriever.retrieve)
+        logger.info(f"✅ Rakibul AI: retrieval index ready ({chunks} chunks)")
+    except Exception as e:
+        logger.warning(f"⚠️  Rakibul AI: retrieval index unavailable, using full prompt — {e}")
+
+    try:
+        searchable = await asyncio.to_thread(article_search.load_or_build)
+        logger.info(f"✅ Search: {searchable} articles indexed")
+    except Exception as e:
+        logger.warning(f"⚠️  Search index unavailable — {e}")
+    coldstart_profiler.mark("warmup_complete")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Validate AI provider keys on startup."""
+    """Validate AI provider keys, open pooled clients, and warm caches on startup."""
     groq_key = os.getenv("GROQ_API_KEY")
     ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 
@@ -39,30 +81,133 @@ async def lifespan(app: FastAPI):
     if not groq_key:
         logger.warning("⚠️  Rakibul AI: No Groq key — will fall back to Ollama if available")
 
+    await client_registry.start()
+    await session_store.start()
+
+    assets = asset_pipeline.load_or_build()
+    logger.info(f"✅ Assets: {assets} hashed → {asset_pipeline.build_dir}")
+    image_derivatives.start()
+
+    portfolio_data.start()
+    # Cache warm-up runs after startup, so the first request is not held behind it
+    warmup = asyncio.create_task(_warm_caches())
+    coldstart_profiler.mark("startup_complete")
+
     yield
+    warmup.cancel()
+    await portfolio_data.close()
+    await image_derivatives.close()
+    article_cache.close()
+    await client_registry.close()
+    await session_store.close()
     logger.info("Rakibul Portfolio shutting down.")
 
 
 app = FastAPI(title="AI Portfolio", lifespan=lifespan)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if coldstart_profiler.enabled:
+    app.add_middleware(coldstart_profiler.middleware)
 
 __tools__ = MyTools()
 
 BASE_DIR = Path(__file__).resolve().parent
-app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+app.mount(
+    "/assets",
+    PrecompressedStaticFiles(directory=asset_pipeline.build_dir, check_dir=False),
+    name="assets",
+)
+app.mount(
+    "/img",
+    PrecompressedStaticFiles(directory=image_derivatives.cache_dir, check_dir=False),
+    name="img",
+)
+app.mount(
+    "/static",
+    CachedStaticFiles(directory=BASE_DIR / "static", cache_control="public, max-age=3600"),
+    name="static",
+)
 templates = Jinja2Templates(directory=BASE_DIR / "templates")
+templates.env.globals["asset_url"] = asset_pipeline.url
+
+
+def _responsive_img(path: str, alt: str, sizes: str = "100vw", **attrs):
+    """Template helper: <picture> with resized WebP/AVIF srcsets for a static image."""
+    return image_derivatives.picture(path, alt, asset_pipeline.url(path), sizes, **attrs)
+
+
+templates.env.globals["responsive_img"] = _responsive_img
+
+DATA_DIR = BASE_DIR / "static" / "utils"
+# Hot-reloaded: edits to static/utils/*.json are picked up without a restart
+portfolio_data = DataProvider(DATA_DIR, loader=__tools__.load_data)
+portfolio_data.load()
+
+
+def _static_url_for(name: str, **path_params) -> str:
+    """Request-free url_for so pages can be rendered ahead of any request."""
+    return str(app.url_path_for(name, **path_params))
+
+
+def _render_home() -> str:
+    template = templates.get_template("index.html")
+    return template.render(data=portfolio_data.get("merge_data"), url_for=_static_url_for)
 
-PORTFOLIO_DATA = __tools__.load_data("static/utils").get("merge_data", None)
+
+def _home_sources():
+    yield from DATA_DIR.glob("*.json")
+    yield from (BASE_DIR / "templates").rglob("*.html")
+
+
+home_page = PageCache("index.html", render=_render_home, sources=_home_sources)
+image_derivatives.on_ready(home_page.invalidate)
+
+
+def _stage_portfolio_data(data: dict):
+    """
+    Reload hook, run in the reload thread: rebuild what depends on the portfolio
+    data, and return the commit that swaps it all in with the data itself.
+    """
+    merge_data = data.get("merge_data")
+    retrieval = portfolio_retriever.build(data=merge_data) if portfolio_retriever.ready else None
+    search = article_search.build(data=merge_data) if article_search.ready else None
+
+    def commit():
+        home_page.invalidate()
+        set_portfolio_data(merge_data)
+        response_cache.clear()
+        if retrieval is not None:
+            portfolio_retriever.install(*retrieval)
+        if search is not None:
+            article_search.install(*search)
+
+    return commit
+
+
+portfolio_data.subscribe(_stage_portfolio_data)
+set_portfolio_data(portfolio_data.get("merge_data"))
 
 
 # ── Existing Routes ───────────────────────────────────────────────────────────
 
 @app.get("/")
 async def home(request: Request):
-    return templates.TemplateResponse(
-        request=request,
-        name="index.html",
-        context={"data": PORTFOLIO_DATA}
-    )
+    page = await home_page.get()
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), page.variants)
+    variant = page.variants[encoding]
+
+    headers = {
+        "ETag": variant.etag,
+        "Cache-Control": "public, max-age=0, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and any(etag_matches(if_none_match, etag) for etag in page.etags):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=variant.body, media_type="text/html; charset=utf-8", headers=headers)
 
 
 @app.get("/health")
@@ -70,17 +215,64 @@ async def health():
     return {"status": "healthy"}
 
 
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+SESSIONS_ACTIVE = metrics.gauge("chat_sessions_active", "Chat sessions currently stored")
+SESSIONS_MAX = metrics.gauge("chat_sessions_max", "Chat session capacity before LRU eviction")
+SESSIONS_EVICTED = metrics.counter("chat_sessions_evicted_total", "Sessions evicted, by reason", ("reason",))
+
+
+async def _collect_session_metrics():
+    stats = await session_store.stats()
+    SESSIONS_ACTIVE.set(stats["active_sessions"])
+    SESSIONS_MAX.set(stats["max_sessions"])
+    for reason in ("expired", "lru"):
+        if f"{reason}_evictions" in stats:
+            # The store keeps running totals; advance the counter by what is new since the last scrape
+            new = stats[f"{reason}_evictions"] - SESSIONS_EVICTED.value(reason)
+            if new > 0:
+                SESSIONS_EVICTED.inc(reason, amount=new)
+
+
+metrics.add_collector(_collect_session_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=await metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/articles/{filename}", response_class=HTMLResponse)
-async def read_article(filename: str):
-    path = Path("static/articles") / filename
-    if not path.exists():
+async def read_article(filename: str, request: Request):
+    article = await article_cache.get(filename)
+    if article is None:
         return HTMLResponse(content="Article not found", status_code=404)
 
-    async with aiofiles.open(path, "r") as f:
-        content = await f.read()
+    headers = {
+        "ETag": article.etag,
+        "Last-Modified": article.last_modified,
+        "Cache-Control": "public, max-age=0, must-revalidate",
+    }
+    if is_not_modified(request, article.etag, article.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=article.body, media_type="text/html; charset=utf-8", headers=headers)
 
-    html_content = markdown.markdown(content)
-    return HTMLResponse(content=html_content)
+
+@app.get("/api/search")
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(5, ge=1, le=20),
+):
+    """Full-text article search: BM25-ranked results with <mark>-highlighted snippets."""
+    if not article_search.ready:
+        # The warm-up task is still loading the index in a thread
+        raise HTTPException(status_code=503, detail="Search is starting up.", headers={"Retry-After": "1"})
+    # Sub-millisecond and in-memory, so it runs on the loop rather than a thread
+    return article_search.search(q, limit)
 
 
 # ── Rakibul AI Routes ─────────────────────────────────────────────────────────
@@ -100,19 +292,26 @@ class ChatResponse(BaseModel):
     session_id: str
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests. Please slow down and try again shortly."},
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
 @app.post("/api/chat/session", response_model=SessionCreateResponse)
-async def create_chat_session():
+async def create_chat_session(request: Request):
     """Create a new chat session. Call once when the widget opens."""
-    session_id = session_store.create_session()
+    admission.check_session_create(admission.client_ip(request))
+    session_id = await session_store.create_session()
     return {"session_id": session_id}
 
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(request_data: ChatRequest):
-    """Main chat endpoint — accepts message + session_id, returns AI response."""
-    session_id = request_data.session_id
-
-    if not session_store.session_exists(session_id):
+async def _validate_chat_request(request_data: ChatRequest) -> str:
+    """Check the session exists and return the sanitized user message."""
+    if not await session_store.session_exists(request_data.session_id):
         raise HTTPException(
             status_code=404,
             detail="Session not found or expired. Please refresh the chat."
@@ -121,19 +320,51 @@ async def chat(request_data: ChatRequest):
     user_message = sanitize_input(request_data.message)
     if not user_message:
         raise HTTPException(status_code=400, detail="Empty message after sanitization.")
+    return user_message
 
-    history = session_store.get_history(session_id)
 
-    result = await get_ai_response(
-        user_message=user_message,
-        history=history,
+def _session_busy() -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail="A reply is already being generated for this session. Please wait for it to finish.",
     )
 
-    ai_response = result["response"]
-    provider = result["provider"]
 
-    session_store.add_message(session_id, "user", user_message)
-    session_store.add_message(session_id, "assistant", ai_response)
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(request_data: ChatRequest, request: Request):
+    """Main chat endpoint — accepts message + session_id, returns AI response."""
+    session_id = request_data.session_id
+    user_message = await _validate_chat_request(request_data)
+    if session_locks.mode == "reject" and session_locks.is_busy(session_id):
+        raise _session_busy()
+    client_ip = admission.client_ip(request)
+    admission.check_chat(client_ip, session_id)
+
+    try:
+        async with session_locks.hold(session_id):
+            history = await session_store.get_history(session_id)
+
+            result = await get_ai_response(
+                user_message=user_message,
+                history=history,
+            )
+
+            ai_response = result["response"]
+            provider = result["provider"]
+
+            await session_store.add_message(session_id, "user", user_message)
+            await session_store.add_message(session_id, "assistant", ai_response)
+    except SessionBusyError:
+        admission.refund_chat(client_ip, session_id)
+        raise _session_busy()
+    except AdmissionRejected:
+        # The LLM queue filled up between check_chat() and the provider call
+        admission.refund_chat(client_ip, session_id)
+        raise
 
     return {
         "response": ai_response,
@@ -142,19 +373,82 @@ async def chat(request_data: ChatRequest):
     }
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request_data: ChatRequest, request: Request):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    Emits `token` events as the provider generates, then one `done` event
+    whose `error` is set when the reply is partial or failed. History is
+    committed to the session only once the stream completes without error.
+    The session lock is taken inside the generator so it is always released
+    with it; a busy session is reported up front as 409, or as an `error`
+    event if another request wins the race.
+    """
+    session_id = request_data.session_id
+    user_message = await _validate_chat_request(request_data)
+    if session_locks.mode == "reject" and session_locks.is_busy(session_id):
+        raise _session_busy()
+    client_ip = admission.client_ip(request)
+    admission.check_chat(client_ip, session_id)
+
+    async def event_stream():
+        try:
+            async with session_locks.hold(session_id):
+                history = await session_store.get_history(session_id)
+                async for event in stream_ai_response(user_message=user_message, history=history):
+                    if event["type"] == "token":
+                        yield _sse("token", {"content": event["content"]})
+                        continue
+
+                    if not event["error"]:
+                        # A failed or cut-off reply is not a turn: keep it out of history
+                        await session_store.add_message(session_id, "user", user_message)
+                        await session_store.add_message(session_id, "assistant", event["response"])
+                    yield _sse("done", {
+                        "response": event["response"],
+                        "provider": event["provider"],
+                        "error": event["error"],
+                        "session_id": session_id,
+                    })
+        except SessionBusyError:
+            admission.refund_chat(client_ip, session_id)
+            yield _sse("error", {"detail": _session_busy().detail, "session_id": session_id})
+        except AdmissionRejected as e:
+            # The LLM queue filled up between the check above and the provider call
+            admission.refund_chat(client_ip, session_id)
+            yield _sse("error", {"detail": str(e), "retry_after": e.retry_after_header, "session_id": session_id})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/chat/health")
 async def chat_health():
     """Health check for the Rakibul AI subsystem."""
-    stats = session_store.stats()
+    stats = await session_store.stats()
     return {
         "status": "ok" if (os.getenv("GROQ_API_KEY") or os.getenv("OLLAMA_HOST")) else "degraded",
         "groq_available": bool(os.getenv("GROQ_API_KEY")),
         "ollama_host": os.getenv("OLLAMA_HOST", "http://localhost:11434"),
         "ollama_model": os.getenv("OLLAMA_MODEL", "llama3.2"),
         **stats,
+        **prompt_sizes(),
+        **response_cache.stats(),
+        **provider_router.stats(),
+        **session_locks.stats(),
+        **client_registry.stats(),
+        **portfolio_data.stats(),
+        **admission.stats(),
+        **article_search.stats(),
     }
 
 
+coldstart_profiler.mark("app_imported")
+
+
 
 
 
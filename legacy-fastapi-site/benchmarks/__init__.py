@@ -0,0 +1,5 @@
+"""
+Benchmarks — route latency/throughput against mock LLM providers.
+Run `python -m benchmarks --help`; see benchmarks.runner for the details.
+`python -m benchmarks.session_memory` measures bytes per chat session.
+"""
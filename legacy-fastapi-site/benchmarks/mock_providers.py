@@ -0,0 +1,137 @@
+"""
+Mock LLM Providers — local stand-ins for Groq and Ollama with fixed latency.
+Groq is mocked at its OpenAI-compatible path (/openai/v1/chat/completions,
+JSON or SSE) and Ollama at /api/chat (JSON or NDJSON), so the app's real
+provider clients, pools, router and breakers are exercised unchanged.
+Point the app at them with GROQ_BASE_URL and OLLAMA_HOST.
+"""
+import json
+import time
+import random
+import asyncio
+from typing import Optional
+
+from aiohttp import web
+
+MOCK_ANSWER = (
+    "Rakibul has shipped production computer-vision and LLM systems, including retail "
+    "shelf analytics and real-time inference services. See github.com/RH-NAYM for code."
+)
+
+
+class MockProvider:
+    """One mock server. Latency is `latency` seconds ± `jitter` (uniform) per request."""
+
+    def __init__(self, name: str, latency: float = 0.05, jitter: float = 0.0, answer: str = MOCK_ANSWER):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.answer = answer
+        self.requests = 0
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _delay(self):
+        self.requests += 1
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _words(self) -> list[str]:
+        words = self.answer.split(" ")
+        return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+    async def groq_chat(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        await self._delay()
+        model = payload.get("model", "mock")
+        if not payload.get("stream"):
+            return web.json_response({
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.answer},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for word in self._words():
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def ollama_chat(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        await self._delay()
+        model = payload.get("model", "mock")
+        if not payload.get("stream"):
+            return web.json_response({
+                "model": model,
+                "message": {"role": "assistant", "content": self.answer},
+                "done": True,
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        for word in self._words():
+            line = {"model": model, "message": {"role": "assistant", "content": word}, "done": False}
+            await response.write((json.dumps(line) + "\n").encode())
+        await response.write((json.dumps({"model": model, "done": True}) + "\n").encode())
+        return response
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post("/openai/v1/chat/completions", self.groq_chat)
+        app.router.add_post("/api/chat", self.ollama_chat)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class MockProviders:
+    """Groq + Ollama mocks, started together."""
+
+    def __init__(self, groq_latency: float = 0.05, ollama_latency: float = 0.2, jitter: float = 0.0):
+        self.groq = MockProvider("groq", groq_latency, jitter)
+        self.ollama = MockProvider("ollama", ollama_latency, jitter)
+
+    async def start(self) -> dict[str, str]:
+        """Start both servers; returns the env vars that point the app at them."""
+        await self.groq.start()
+        await self.ollama.start()
+        return {
+            "GROQ_API_KEY": "mock-key",
+            "GROQ_BASE_URL": self.groq.url,
+            "OLLAMA_HOST": self.ollama.url,
+        }
+
+    async def close(self):
+        await self.groq.close()
+        await self.ollama.close()
+
+    def stats(self) -> dict:
+        return {
+            "groq": {"latency_s": self.groq.latency, "requests": self.groq.requests},
+            "ollama": {"latency_s": self.ollama.latency, "requests": self.ollama.requests},
+        }
@@ -0,0 +1,304 @@
+"""
+Benchmark Runner — closed-loop load against every route, in two modes:
+  inprocess   httpx.ASGITransport straight into the ASGI app (framework and
+              app cost only, no sockets)
+  uvicorn     a real `uvicorn app:app` subprocess driven over TCP
+
+Each scenario runs `concurrency` workers issuing requests back to back and
+reports throughput and p50/p95/p99 latency. Chat scenarios hit the mock
+providers in benchmarks.mock_providers, and every worker gets its own
+session so per-session locking doesn't serialise the run. The first-turn
+response cache is disabled unless --response-cache is passed, so /api/chat
+measures the full provider path.
+
+  python -m benchmarks [--mode inprocess|uvicorn|both] [--requests 500]
+                       [--chat-requests 100] [--concurrency 16]
+                       [--groq-latency 0.05] [--ollama-latency 0.2]
+                       [--output report.json] [--save-baseline baseline.json]
+                       [--baseline baseline.json] [--tolerance 0.15]
+
+With --baseline, each scenario's p95 and throughput are compared against the
+stored report. The exit status is 1 when any of them regresses by more than
+--tolerance.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+import httpx
+
+from benchmarks.mock_providers import MockProviders
+
+SITE_DIR = Path(__file__).resolve().parent.parent
+ARTICLE = "async_python.html"
+
+
+class Scenario(NamedTuple):
+    name: str
+    chat: bool  # needs sessions and counts against --chat-requests
+    # (client, worker index, request number, sessions) -> response
+    send: Callable
+
+
+async def _home(client, worker, n, sessions):
+    return await client.get("/", headers={"Accept-Encoding": "br, gzip"})
+
+
+async def _article(client, worker, n, sessions):
+    return await client.get(f"/articles/{ARTICLE}")
+
+
+async def _health(client, worker, n, sessions):
+    return await client.get("/health")
+
+
+async def _create_session(client, worker, n, sessions):
+    return await client.post("/api/chat/session")
+
+
+async def _chat(client, worker, n, sessions):
+    # Unique text per request: no two requests share a cache key
+    return await client.post("/api/chat", json={
+        "session_id": sessions[worker],
+        "message": f"What production systems has he built? (benchmark {worker}-{n})",
+    })
+
+
+SCENARIOS = [
+    Scenario("GET /", False, _home),
+    Scenario(f"GET /articles/{ARTICLE}", False, _article),
+    Scenario("GET /health", False, _health),
+    Scenario("POST /api/chat/session", False, _create_session),
+    Scenario("POST /api/chat", True, _chat),
+]
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, total: int, concurrency: int) -> dict:
+    sessions = []
+    if scenario.chat:
+        for _ in range(concurrency):
+            response = await client.post("/api/chat/session")
+            sessions.append(response.json()["session_id"])
+
+    counter = iter(range(total))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker(index: int):
+        nonlocal errors
+        for n in counter:
+            start = time.perf_counter()
+            try:
+                response = await scenario.send(client, index, n, sessions)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    # A few untimed requests first, so one-off lazy work isn't in the numbers
+    for n in range(min(5, total)):
+        await scenario.send(client, 0, -n - 1, sessions)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_scenarios(client: httpx.AsyncClient, args) -> dict:
+    results = {}
+    for scenario in SCENARIOS:
+        total = args.chat_requests if scenario.chat else args.requests
+        results[scenario.name] = await run_scenario(client, scenario, total, args.concurrency)
+        print(f"  {scenario.name:<40} {_line(results[scenario.name])}", file=sys.stderr)
+    return results
+
+
+def _line(result: dict) -> str:
+    return (
+        f"{result['throughput_rps']:>8.1f} req/s  p50 {result['p50_ms']:>8.2f}  "
+        f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}"
+    )
+
+
+# ── Modes ─────────────────────────────────────────────────────────────────────
+
+async def run_inprocess(args) -> dict:
+    from app import app  # imported after the provider env vars are set
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            return await run_scenarios(client, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(args, env: dict) -> dict:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=SITE_DIR, env={**os.environ, **env},
+    )
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            return await run_scenarios(client, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+# ── Baseline ──────────────────────────────────────────────────────────────────
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Per-scenario deltas vs the baseline; `regressed` marks anything beyond tolerance."""
+    rows = []
+    for mode, scenarios in report["results"].items():
+        for name, current in scenarios.items():
+            previous = baseline.get("results", {}).get(mode, {}).get(name)
+            if previous is None:
+                continue
+            p95_change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] if previous["p95_ms"] else 0.0
+            rps_change = (
+                (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"]
+                if previous["throughput_rps"] else 0.0
+            )
+            rows.append({
+                "mode": mode,
+                "scenario": name,
+                "p95_change": round(p95_change, 3),
+                "throughput_change": round(rps_change, 3),
+                "regressed": p95_change > tolerance or rps_change < -tolerance,
+            })
+    return rows
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+async def _main(args) -> dict:
+    providers = MockProviders(args.groq_latency, args.ollama_latency, args.jitter)
+    env = await providers.start()
+    if not args.response_cache:
+        env["RESPONSE_CACHE_SIZE"] = "0"
+    env["IMAGE_DERIVATIVES"] = "0"  # don't compete with the run for CPU
+    env["RATE_LIMIT_ENABLED"] = "0"  # one client IP issues every request
+    env["SESSION_JOURNAL"] = "0"  # benchmark sessions are throwaway
+    os.environ.update(env)
+
+    results = {}
+    try:
+        if args.mode in ("inprocess", "both"):
+            print("inprocess:", file=sys.stderr)
+            results["inprocess"] = await run_inprocess(args)
+        if args.mode in ("uvicorn", "both"):
+            print("uvicorn:", file=sys.stderr)
+            results["uvicorn"] = await run_uvicorn(args, env)
+    finally:
+        await providers.close()
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "config": {
+            "requests": args.requests,
+            "chat_requests": args.chat_requests,
+            "concurrency": args.concurrency,
+            "response_cache": args.response_cache,
+        },
+        "mock_providers": providers.stats(),
+        "results": results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Route latency/throughput benchmark.")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn", "both"), default="both")
+    parser.add_argument("--requests", type=int, default=500, help="requests per non-chat scenario")
+    parser.add_argument("--chat-requests", type=int, default=100, help="requests per chat scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--groq-latency", type=float, default=0.05, help="mock Groq latency, seconds")
+    parser.add_argument("--ollama-latency", type=float, default=0.2, help="mock Ollama latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± uniform jitter on mock latency, seconds")
+    parser.add_argument("--response-cache", action="store_true", help="keep the first-turn response cache on")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this stored report")
+    parser.add_argument("--save-baseline", help="also store this run as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95/throughput regression (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    os.chdir(SITE_DIR)
+    if str(SITE_DIR) not in sys.path:
+        sys.path.insert(0, str(SITE_DIR))
+
+    report = asyncio.run(_main(args))
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.tolerance)
+        report["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "scenarios": rows}
+        for row in rows:
+            flag = "REGRESSED" if row["regressed"] else "ok"
+            print(
+                f"  {row['mode']:<10} {row['scenario']:<40} p95 {row['p95_change']:+.1%}  "
+                f"throughput {row['throughput_change']:+.1%}  {flag}",
+                file=sys.stderr,
+            )
+        status = 1 if any(row["regressed"] for row in rows) else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(text + "\n", encoding="utf-8")
+    return status
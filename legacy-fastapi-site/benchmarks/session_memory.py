@@ -0,0 +1,141 @@
+"""
+Session Memory Benchmark — bytes per in-memory chat session, by representation:
+  dicts         the previous layout: a dict per session holding deques of
+                {"role", "content"} dicts and a parallel token-count deque
+  slots         ai_assistant.session_model Session/Message, uncompressed
+  slots+zlib    the same, with older messages compressed (the default)
+
+Sessions are filled through the same code paths the store uses, with
+message text sampled from the site's articles (short user questions, longer
+assistant answers). Memory is measured with tracemalloc, so it includes the
+content strings as well as the containers.
+
+  python -m benchmarks.session_memory [--sessions 500] [--messages 20] [--output report.json]
+"""
+import sys
+import json
+import random
+import argparse
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from typing import Callable, Optional
+
+from ai_assistant import session_model
+from ai_assistant.session_model import ROLES, Message, Session
+from ai_assistant.tokens import estimate_message_tokens
+from core.text import extract_html_text
+
+ARTICLES_DIR = Path(__file__).resolve().parent.parent / "static" / "articles"
+
+
+def _corpus() -> list[str]:
+    words = []
+    for path in sorted(ARTICLES_DIR.glob("*.html")):
+        for block in extract_html_text(path.read_text(encoding="utf-8")).blocks:
+            words.extend(block.split())
+    return words
+
+
+def _conversation(words: list[str], messages: int, rng: random.Random) -> list[tuple[str, str]]:
+    turns = []
+    for i in range(messages):
+        role = "user" if i % 2 == 0 else "assistant"
+        length = rng.randint(8, 30) if role == "user" else rng.randint(80, 220)
+        start = rng.randrange(len(words) - length)
+        # Build a fresh str per message, as request bodies and provider replies are
+        turns.append((role, " ".join(words[start:start + length])))
+    return turns
+
+
+def _dict_session(turns: list[tuple[str, str]]) -> dict:
+    session = {
+        "messages": deque(),
+        "token_counts": deque(),
+        "history_tokens": 0,
+        "created_at": 0.0,
+        "last_active": 0.0,
+        "message_count": 0,
+    }
+    for role, content in turns:
+        tokens = estimate_message_tokens(content)
+        session["messages"].append({"role": role, "content": content})
+        session["token_counts"].append(tokens)
+        session["history_tokens"] += tokens
+        session["message_count"] += 1
+    return session
+
+
+def _slotted_session(turns: list[tuple[str, str]]) -> Session:
+    session = Session(0.0)
+    for role, content in turns:
+        session.append(Message(ROLES[role], content, estimate_message_tokens(content)))
+    return session
+
+
+def measure(build: Callable, conversations: list[list[tuple[str, str]]]) -> int:
+    """Bytes per session allocated by `build` (content strings included)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    # Fresh copies of the text, allocated while tracing: strings a representation
+    # keeps are counted, ones it replaces (compression) are freed again
+    store = {
+        f"{i:036d}": build([(role, "".join(content)) for role, content in turns])
+        for i, turns in enumerate(conversations)
+    }
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert len(store) == len(conversations)
+    return round(total / len(conversations))
+
+
+def run(sessions: int, messages: int, seed: int = 0) -> dict:
+    words = _corpus()
+    rng = random.Random(seed)
+    conversations = [_conversation(words, messages, rng) for _ in range(sessions)]
+    content_bytes = sum(len(content) for turns in conversations for _, content in turns) // sessions
+
+    results = {"dicts": measure(_dict_session, conversations)}
+    compress = session_model.SESSION_COMPRESS
+    try:
+        session_model.SESSION_COMPRESS = False
+        results["slots"] = measure(_slotted_session, conversations)
+        session_model.SESSION_COMPRESS = True
+        results["slots+zlib"] = measure(_slotted_session, conversations)
+    finally:
+        session_model.SESSION_COMPRESS = compress
+
+    baseline = results["dicts"]
+    return {
+        "sessions": sessions,
+        "messages_per_session": messages,
+        "content_chars_per_session": content_bytes,
+        "compress_after": session_model.SESSION_COMPRESS_AFTER,
+        "compress_min_bytes": session_model.SESSION_COMPRESS_MIN_BYTES,
+        "bytes_per_session": results,
+        "vs_dicts": {name: round(value / baseline, 3) for name, value in results.items()},
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.session_memory", description=__doc__.split("\n")[1])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=20, help="messages per session")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sessions, args.messages)
+    for name, value in report["bytes_per_session"].items():
+        print(f"  {name:<12} {value:>8} bytes/session  ({report['vs_dicts'][name]:.0%} of dicts)", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
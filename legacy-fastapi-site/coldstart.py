@@ -0,0 +1,244 @@
+"""
+Cold-Start Profiler — per-module import time and time-to-first-request.
+
+In-process (serverless logs):
+  COLDSTART_PROFILE=1   app.py imports this module first, so every import
+                        after it is timed. The report is logged as one JSON
+                        line when the first request completes.
+
+CLI (track cold starts across releases):
+  python coldstart.py [--runs 5] [--top 25] [--output coldstart.json]
+Each run is a fresh interpreter that imports app, runs the lifespan and
+serves GET / in-process. Milestones are reported as the median across the
+runs that reached them (milestone_runs) and module times from the median run.
+
+Times are milliseconds since this module was imported (the top of app.py);
+interpreter start-up before that is not included.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import importlib.abc
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+COLDSTART_PROFILE = os.getenv("COLDSTART_PROFILE", "0") not in ("0", "false", "no", "")
+COLDSTART_TOP     = int(os.getenv("COLDSTART_TOP", "25"))
+
+
+class _TimedLoader:
+    """Proxy loader that times exec_module; everything else is delegated."""
+
+    def __init__(self, loader, profiler: "ColdStartProfiler", name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit()
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+
+    def __init__(self, profiler: "ColdStartProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profiler, name)
+        return spec
+
+
+class ColdStartProfiler:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.enabled = False
+        self.milestones: dict[str, float] = {}
+        # module → [self ms, cumulative ms]
+        self.modules: dict[str, list[float]] = {}
+        self._stack: list[list] = []
+        self.import_ms = 0.0  # outermost imports only, so nested ones are not double-counted
+        self._finder: Optional[_TimingFinder] = None
+        self._reported = False
+
+    def install(self):
+        """Start timing imports (idempotent)."""
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+        self.enabled = True
+
+    def uninstall(self):
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def _enter(self, name: str):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        name, start, children = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        self.modules[name] = [(cumulative - children) * 1000, cumulative * 1000]
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        else:
+            self.import_ms += cumulative * 1000
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def mark(self, milestone: str):
+        """Record a milestone (first occurrence wins)."""
+        if self.enabled and milestone not in self.milestones:
+            self.milestones[milestone] = round(self.elapsed_ms(), 2)
+
+    def report(self, top: int = COLDSTART_TOP) -> dict:
+        slowest = sorted(self.modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        return {
+            "milestones_ms": dict(self.milestones),
+            "modules_imported": len(self.modules),
+            "import_ms": round(self.import_ms, 2),
+            "slowest_imports_ms": [
+                {"module": name, "self": round(own, 2), "cumulative": round(cumulative, 2)}
+                for name, (own, cumulative) in slowest
+            ],
+        }
+
+    def middleware(self, app):
+        """ASGI middleware that marks `first_request` and logs the report once."""
+        profiler = self
+
+        async def timed_app(scope, receive, send):
+            if scope["type"] != "http" or profiler._reported:
+                return await app(scope, receive, send)
+            try:
+                await app(scope, receive, send)
+            finally:
+                profiler.mark("first_request")
+                profiler._reported = True
+                profiler.uninstall()
+                logger.info(f"Cold start: {json.dumps(profiler.report())}")
+
+        return timed_app
+
+
+# Singleton instance — imported first by app.py
+coldstart_profiler = ColdStartProfiler()
+if COLDSTART_PROFILE and __name__ != "__main__":
+    coldstart_profiler.install()
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+async def _serve_first_request(app) -> int:
+    """Run the lifespan and a GET / against the ASGI app, without a server."""
+    status = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"localhost"), (b"accept-encoding", b"br, gzip")],
+        "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    async with app.router.lifespan_context(app):
+        await app(scope, receive, send)
+    return status
+
+
+def _child(top: int):
+    import asyncio
+    logging.disable(logging.INFO)
+    from app import app
+    status = asyncio.run(_serve_first_request(app))
+    report = coldstart_profiler.report(top)
+    report["first_request_status"] = status
+    print(json.dumps(report))
+
+
+def main(argv: Optional[list[str]] = None):
+    import argparse
+    import statistics
+    import subprocess
+
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and time-to-first-request.")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=COLDSTART_TOP, help="slowest modules to list")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return _child(args.top)
+
+    env = {**os.environ, "COLDSTART_PROFILE": "1"}
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--top", str(args.top)],
+            cwd=here, env=env, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    # Not every run records every milestone (warmup_complete is lost when shutdown
+    # cancels the warm-up first): take each median over the runs that have it
+    names = list(dict.fromkeys(name for run in runs for name in run["milestones_ms"]))
+    samples = {name: [run["milestones_ms"][name] for run in runs if name in run["milestones_ms"]] for name in names}
+    milestones = {name: round(statistics.median(values), 2) for name, values in samples.items()}
+    median_run = sorted(runs, key=lambda run: run["milestones_ms"].get("first_request", 0))[len(runs) // 2]
+    report = {
+        "python": sys.version.split()[0],
+        "runs": len(runs),
+        "milestones_ms": milestones,
+        "milestone_runs": {name: len(values) for name, values in samples.items()},
+        "import_ms": round(statistics.median(run["import_ms"] for run in runs), 2),
+        "modules_imported": median_run["modules_imported"],
+        "slowest_imports_ms": median_run["slowest_imports_ms"],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    # Run as a script, this module is __main__: hand the CLI the instance app.py will use
+    import coldstart
+    coldstart.main()
@@ -0,0 +1,5 @@
+from core.articles import article_cache
+from core.clients import client_registry
+from core.http_cache import choose_encoding, etag_matches, is_not_modified
+
+__all__ = ["article_cache", "client_registry", "choose_encoding", "etag_matches", "is_not_modified"]
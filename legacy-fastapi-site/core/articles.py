@@ -0,0 +1,182 @@
+"""
+Article Cache — pre-rendered responses for /articles/{filename}.
+Files under static/articles/ only change between deploys, so each one is
+rendered once and served from memory. Entries are keyed by path + mtime:
+a changed mtime (hot edit in dev) triggers a re-render on the next hit.
+
+Rendering never blocks the event loop for long: a document of at least
+ARTICLE_RENDER_THRESHOLD bytes is read and rendered in a worker pool, and
+only smaller ones (cheaper than the hop to a worker) are rendered inline.
+Concurrent misses for the same file share one render. At startup, warm()
+sends every article to the pool at once.
+
+A thread pool is the default. Renders take a few milliseconds, so this
+keeps the loop free without a forked copy of the app per core. The process
+pool (parallel across cores) is opt-in. Where it cannot be created (no
+/dev/shm for multiprocessing semaphores, as on Lambda/Vercel), the
+thread pool is used instead.
+
+Env:
+  ARTICLE_RENDER_POOL        thread | process            (default thread)
+  ARTICLE_RENDER_WORKERS     pool size, 0 = one per core (default 0)
+  ARTICLE_RENDER_THRESHOLD   bytes; smaller files render inline (default 4096)
+"""
+import os
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.utils import formatdate
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+ARTICLES_DIR = Path(__file__).resolve().parent.parent / "static" / "articles"
+
+ARTICLE_RENDER_POOL      = os.getenv("ARTICLE_RENDER_POOL", "thread")
+ARTICLE_RENDER_WORKERS   = int(os.getenv("ARTICLE_RENDER_WORKERS", "0")) or None  # None → one per core
+ARTICLE_RENDER_THRESHOLD = int(os.getenv("ARTICLE_RENDER_THRESHOLD", "4096"))
+
+
+class CompiledArticle(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: str
+    mtime_ns: int
+
+
+def render_article(source: str) -> str:
+    """Render a raw article to HTML (same output the route has always served)."""
+    import markdown  # deferred: only needed when an article is (re-)rendered
+    return markdown.markdown(source)
+
+
+def _render_file(path: str) -> bytes:
+    """Worker entry point: read and render one article (module-level so it pickles)."""
+    with open(path, encoding="utf-8") as f:
+        return render_article(f.read()).encode("utf-8")
+
+
+class ArticleCache:
+    """
+    In-memory cache of rendered articles.
+    A lookup costs one stat() call; disk reads and Markdown parsing only
+    happen on the first hit or after the file's mtime changes.
+    """
+
+    def __init__(
+        self,
+        articles_dir: Path = ARTICLES_DIR,
+        pool: str = ARTICLE_RENDER_POOL,
+        workers: Optional[int] = ARTICLE_RENDER_WORKERS,
+        threshold: int = ARTICLE_RENDER_THRESHOLD,
+    ):
+        self.articles_dir = Path(articles_dir).resolve()
+        self.pool = pool if pool in ("process", "thread") else "thread"
+        self.workers = workers
+        self.threshold = threshold
+        self._executor: Optional[Executor] = None
+        self._store: dict[str, CompiledArticle] = {}
+        # (filename, mtime_ns) → render in progress, shared by concurrent misses
+        self._pending: dict[tuple[str, int], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.rendered_inline = 0
+        self.rendered_in_pool = 0
+
+    def resolve(self, filename: str) -> Optional[Path]:
+        """Map a request filename to a file inside the articles dir, None if invalid."""
+        path = (self.articles_dir / filename).resolve()
+        if path.parent != self.articles_dir or not path.is_file():
+            return None
+        return path
+
+    async def get(self, filename: str) -> Optional[CompiledArticle]:
+        """Return the compiled article, rendering it if missing or stale."""
+        return await self._get(filename, offload_all=False)
+
+    async def _get(self, filename: str, offload_all: bool) -> Optional[CompiledArticle]:
+        path = self.resolve(filename)
+        if path is None:
+            self._store.pop(filename, None)
+            return None
+
+        stat_result = path.stat()
+        mtime_ns = stat_result.st_mtime_ns
+        cached = self._store.get(filename)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        key = (filename, mtime_ns)
+        pending = self._pending.get(key)
+        if pending is None:
+            offload = offload_all or stat_result.st_size >= self.threshold
+            pending = self._pending[key] = asyncio.ensure_future(self._compile(path, mtime_ns, offload))
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        compiled = await asyncio.shield(pending)
+        self._store[filename] = compiled
+        return compiled
+
+    async def warm(self) -> int:
+        """Render every article up front, all at once in the pool. Returns the number compiled."""
+        names = [path.name for path in sorted(self.articles_dir.iterdir()) if path.is_file()]
+        results = await asyncio.gather(*(self._get(name, offload_all=True) for name in names))
+        return sum(result is not None for result in results)
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.pool == "process":
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    return self._executor
+                except (OSError, NotImplementedError) as e:
+                    logger.warning(f"Article render process pool unavailable ({e}); using threads")
+                    self.pool = "thread"
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="article-render")
+        return self._executor
+
+    async def _render(self, path: Path, offload: bool) -> bytes:
+        if not offload:
+            self.rendered_inline += 1
+            return _render_file(str(path))
+
+        self.rendered_in_pool += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool(), _render_file, str(path))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): start a fresh pool next time
+            logger.warning(f"Article render pool broken, rendering {path.name} in a thread")
+            self._executor = None
+            return await asyncio.to_thread(_render_file, str(path))
+
+    async def _compile(self, path: Path, mtime_ns: int, offload: bool) -> CompiledArticle:
+        body = await self._render(path, offload)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        last_modified = formatdate(mtime_ns / 1e9, usegmt=True)
+        logger.debug(f"Compiled article {path.name} ({len(body)} bytes)")
+        return CompiledArticle(body, etag, last_modified, mtime_ns)
+
+    def close(self):
+        """Shut the render pool down (idempotent)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "cached_articles": len(self._store),
+            "hits": self.hits,
+            "misses": self.misses,
+            "render_pool": self.pool,
+            "rendered_inline": self.rendered_inline,
+            "rendered_in_pool": self.rendered_in_pool,
+        }
+
+
+# Singleton instance — imported by app.py
+article_cache = ArticleCache()
@@ -0,0 +1,245 @@
+"""
+Static Asset Pipeline — content-hashed, precompressed copies of static files.
+Runs once at startup (or ahead of time: `python -m core.assets`):
+  static/css/main.css  →  <ASSET_BUILD_DIR>/css/main.3f2a9c1d04.css (+ .gz, + .br)
+and writes a manifest mapping logical names to hashed ones. Hashed files are
+served from /assets by PrecompressedStaticFiles with `Cache-Control: immutable`;
+templates resolve URLs through the `asset_url()` helper, which falls back to
+/static for anything not in the manifest (or when ASSET_PIPELINE=0).
+
+A build made ahead of time is used in place when its manifest matches the
+sources, even on a read-only filesystem; only a missing or stale build is
+redone, in a writable (possibly /tmp) directory.
+"""
+import os
+import json
+import stat
+import shutil
+import hashlib
+import tempfile
+import logging
+import mimetypes
+from pathlib import Path
+from typing import Optional
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import Response
+from starlette.types import Scope
+
+from core.compression import precompress
+from core.http_cache import choose_encoding
+from core.storage import writable_dir
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+STATIC_DIR = BASE_DIR / "static"
+ASSET_BUILD_DIR = Path(os.getenv("ASSET_BUILD_DIR", BASE_DIR / ".cache" / "assets"))
+ASSET_PIPELINE = os.getenv("ASSET_PIPELINE", "1") not in ("0", "false", "no")
+
+# Files that get hashed names (everything the pages link directly)
+HASHED_SUFFIXES = {".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".webp", ".avif", ".ico", ".woff2"}
+# Of those, the ones worth precompressing (images are already compressed)
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".html", ".txt"}
+# Served as-is from /static (articles are linked by stable URL)
+EXCLUDED_DIRS = {"articles", "utils"}
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MANIFEST_NAME = "manifest.json"
+
+
+class AssetPipeline:
+
+    def __init__(self, source_dir: Path = STATIC_DIR, build_dir: Path = ASSET_BUILD_DIR, url_prefix: str = "/assets"):
+        self.source_dir = Path(source_dir)
+        self.url_prefix = url_prefix
+        self.manifest: dict[str, str] = {}
+        # A current prebuilt tree (`python -m core.assets` at deploy time) is served in
+        # place, even from a read-only filesystem; only a rebuild needs a writable dir
+        build_dir = Path(build_dir)
+        self._prebuilt = self._read_manifest(build_dir, self._fingerprint(self._sources()))
+        self.build_dir = build_dir if self._prebuilt is not None else writable_dir(build_dir, "rakibul-assets")
+
+    def _sources(self) -> list[Path]:
+        return sorted(
+            path for path in self.source_dir.rglob("*")
+            if path.is_file()
+            and path.suffix.lower() in HASHED_SUFFIXES
+            and path.relative_to(self.source_dir).parts[0] not in EXCLUDED_DIRS
+        )
+
+    def _fingerprint(self, sources: list[Path]) -> dict[str, list[int]]:
+        return {
+            path.relative_to(self.source_dir).as_posix(): [path.stat().st_mtime_ns, path.stat().st_size]
+            for path in sources
+        }
+
+    def _read_manifest(self, build_dir: Path, fingerprint: dict) -> Optional[dict[str, str]]:
+        """The build's asset map if its manifest matches `fingerprint`, else None."""
+        manifest_path = build_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        try:
+            saved = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if saved.get("fingerprint") == fingerprint:
+                return saved["assets"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable asset manifest: {e}")
+        return None
+
+    def load_or_build(self) -> int:
+        """Reuse an existing build whose sources are unchanged, else rebuild. Returns asset count."""
+        if self._prebuilt is not None:
+            self.manifest, self._prebuilt = self._prebuilt, None
+            return len(self.manifest)
+
+        sources = self._sources()
+        fingerprint = self._fingerprint(sources)
+        saved = self._read_manifest(self.build_dir, fingerprint)
+        if saved is not None:
+            self.manifest = saved
+            return len(self.manifest)
+
+        self._build(sources, fingerprint)
+        return len(self.manifest)
+
+    def _build(self, sources: list[Path], fingerprint: dict):
+        # Build next to the live dir and swap it in, so a failed build (or a worker
+        # serving /assets meanwhile) never sees a half-written tree
+        staging = Path(tempfile.mkdtemp(prefix=f".{self.build_dir.name}.", dir=self.build_dir.parent))
+        try:
+            os.chmod(staging, 0o755)
+            manifest = self._write(staging, sources, fingerprint)
+            self._install(staging)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.manifest = manifest
+        logger.info(f"Asset pipeline built {len(manifest)} assets into {self.build_dir}")
+
+    def _write(self, out_dir: Path, sources: list[Path], fingerprint: dict) -> dict[str, str]:
+        manifest = {}
+        for path in sources:
+            logical = path.relative_to(self.source_dir).as_posix()
+            body = path.read_bytes()
+            digest = hashlib.sha256(body).hexdigest()[:10]
+            hashed = Path(logical).with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+            target = out_dir / hashed
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(body)
+
+            if path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+                variants = precompress(body)
+                if "gzip" in variants:
+                    target.with_name(target.name + ".gz").write_bytes(variants["gzip"])
+                if "br" in variants:
+                    target.with_name(target.name + ".br").write_bytes(variants["br"])
+            manifest[logical] = hashed
+
+        (out_dir / MANIFEST_NAME).write_text(
+            json.dumps({"fingerprint": fingerprint, "assets": manifest}, indent=2),
+            encoding="utf-8",
+        )
+        return manifest
+
+    def _install(self, staging: Path):
+        # os.replace() can't overwrite a non-empty dir: move the old build aside first
+        retired = staging.with_name(staging.name + ".old")
+        try:
+            os.replace(self.build_dir, retired)
+        except FileNotFoundError:
+            retired = None
+        try:
+            os.replace(staging, self.build_dir)
+        except OSError as e:
+            # Another worker swapped in its build in between; same sources, so keep that one
+            logger.debug(f"Asset build dir already replaced, discarding ours: {e}")
+        if retired is not None:
+            shutil.rmtree(retired, ignore_errors=True)
+
+    def url(self, logical: str) -> str:
+        """Template helper: hashed /assets URL for a logical static path, else /static."""
+        logical = logical.lstrip("/")
+        hashed = self.manifest.get(logical) if ASSET_PIPELINE else None
+        if hashed is None:
+            return f"/static/{logical}"
+        return f"{self.url_prefix}/{hashed}"
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that stamps every successful response with `cache_control`."""
+
+    def __init__(self, *args, cache_control: str = IMMUTABLE_CACHE_CONTROL, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            self._stamp(response)
+        return response
+
+    def _stamp(self, response: Response):
+        response.headers["Cache-Control"] = self.cache_control
+
+
+class PrecompressedStaticFiles(CachedStaticFiles):
+    """
+    CachedStaticFiles that serves a `.br`/`.gz` sibling when the client
+    accepts it. Only worth it where the siblings exist (/assets, /img):
+    each miss costs a lookup in a worker thread.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._encoded_response(path, scope)
+        if response is None:
+            return await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            self._stamp(response)
+        return response
+
+    def _stamp(self, response: Response):
+        super()._stamp(response)
+        response.headers["Vary"] = "Accept-Encoding"
+
+    async def _encoded_response(self, path: str, scope: Scope):
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        headers = dict(scope["headers"])
+        accept = headers.get(b"accept-encoding", b"").decode("latin-1")
+
+        candidates = ["br", "gzip"]
+        while candidates:
+            encoding = choose_encoding(accept, candidates)
+            if encoding == "identity":
+                return None
+            candidates.remove(encoding)
+
+            suffix = ".br" if encoding == "br" else ".gz"
+            try:
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            except (OSError, ValueError):
+                continue
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                break
+        else:
+            return None
+
+        response = self.file_response(full_path, stat_result, scope)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+            media_type += "; charset=utf-8"
+        response.headers["Content-Type"] = media_type
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+# Singleton instance — built in the app lifespan, exposed to templates as asset_url()
+asset_pipeline = AssetPipeline()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    count = asset_pipeline.load_or_build()
+    print(f"{count} assets → {asset_pipeline.build_dir}")
@@ -0,0 +1,133 @@
+"""
+BM25 Index — compact, array-backed inverted index (NumPy).
+Postings are stored CSR-style: `term_ptr[t]:term_ptr[t+1]` slices `doc_ids`
+and `weights` for term t. Weights are precomputed BM25 contributions, so a
+query is a handful of vectorised scatter-adds. Indexes round-trip through a
+single .npz file (no pickle) together with caller-supplied JSON metadata.
+"""
+import os
+import json
+import math
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+class BM25Index:
+
+    def __init__(
+        self,
+        vocab: dict[str, int],
+        term_ptr: np.ndarray,
+        doc_ids: np.ndarray,
+        weights: np.ndarray,
+        num_docs: int,
+    ):
+        self.vocab = vocab
+        self.term_ptr = term_ptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.num_docs = num_docs
+
+    @classmethod
+    def build(cls, docs: list[list[str]], k1: float = BM25_K1, b: float = BM25_B) -> "BM25Index":
+        """Build from pre-tokenised documents (document i gets doc id i)."""
+        vocab: dict[str, int] = {}
+        doc_freq: list[int] = []
+        term_counts = [Counter(tokens) for tokens in docs]
+        lengths = np.array([len(tokens) for tokens in docs], dtype=np.float32)
+        avg_len = float(lengths.mean()) if len(docs) and lengths.sum() else 1.0
+
+        for counts in term_counts:
+            for term in counts:
+                term_id = vocab.setdefault(term, len(vocab))
+                if term_id == len(doc_freq):
+                    doc_freq.append(0)
+                doc_freq[term_id] += 1
+
+        n = len(docs)
+        postings_terms, postings_docs, postings_weights = [], [], []
+        for doc_id, counts in enumerate(term_counts):
+            norm = k1 * (1 - b + b * lengths[doc_id] / avg_len)
+            for term, tf in counts.items():
+                term_id = vocab[term]
+                df = doc_freq[term_id]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                postings_terms.append(term_id)
+                postings_docs.append(doc_id)
+                postings_weights.append(idf * tf * (k1 + 1) / (tf + norm))
+
+        terms = np.array(postings_terms, dtype=np.int32)
+        order = np.argsort(terms, kind="stable")
+        term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(vocab)), out=term_ptr[1:])
+        return cls(
+            vocab,
+            term_ptr,
+            np.array(postings_docs, dtype=np.int32)[order],
+            np.array(postings_weights, dtype=np.float32)[order],
+            n,
+        )
+
+    def scores(self, query_terms: list[str]) -> np.ndarray:
+        """BM25 score of every document for the query."""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in set(query_terms):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_ptr[term_id], self.term_ptr[term_id + 1]
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+        return scores
+
+    def search(self, query_terms: list[str], k: int = 5) -> list[tuple[int, float]]:
+        """Top-k (doc_id, score) pairs with a positive score, best first."""
+        if not self.num_docs:
+            return []
+        scores = self.scores(query_terms)
+        k = min(k, self.num_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top if scores[doc_id] > 0]
+
+    def save(self, path: Path, meta: Optional[dict] = None):
+        """Write the index and JSON-serialisable `meta` to a single .npz file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        vocab_terms = sorted(self.vocab, key=self.vocab.__getitem__)
+        header = json.dumps({"vocab": vocab_terms, "num_docs": self.num_docs, "meta": meta or {}})
+        # Unique temp name: a hot reload and the startup build may save concurrently
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    header=np.frombuffer(header.encode("utf-8"), dtype=np.uint8),
+                    term_ptr=self.term_ptr,
+                    doc_ids=self.doc_ids,
+                    weights=self.weights,
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["BM25Index", dict]:
+        """Load an index saved with save(). Returns (index, meta)."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            header = json.loads(data["header"].tobytes().decode("utf-8"))
+            index = cls(
+                {term: i for i, term in enumerate(header["vocab"])},
+                data["term_ptr"],
+                data["doc_ids"],
+                data["weights"],
+                header["num_docs"],
+            )
+        return index, header["meta"]
@@ -0,0 +1,107 @@
+"""
+Client Registry — long-lived, pooled HTTP clients shared across requests.
+Created on first use and closed in the FastAPI lifespan, so chat turns and
+image fetches reuse keep-alive connections instead of paying for a new
+TCP + TLS handshake every call. Nothing is opened at startup: aiohttp and
+groq take ~250 ms to import, which would sit on the cold-start path.
+
+Pool limits (env):
+  HTTP_POOL_MAX_CONNECTIONS   total open connections   (default 100)
+  HTTP_POOL_MAX_PER_HOST      connections per host     (default 20)
+  HTTP_POOL_KEEPALIVE         idle keep-alive seconds  (default 30)
+"""
+import os
+import logging
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_PER_HOST    = int(os.getenv("HTTP_POOL_MAX_PER_HOST", "20"))
+HTTP_POOL_KEEPALIVE       = float(os.getenv("HTTP_POOL_KEEPALIVE", "30"))
+
+
+class ClientRegistry:
+    """
+    Holds one aiohttp session (Ollama, image fetches) and one AsyncGroq client.
+    Clients are created lazily on first use and are always safe to close twice.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_POOL_MAX_CONNECTIONS,
+        max_per_host: int = HTTP_POOL_MAX_PER_HOST,
+        keepalive: float = HTTP_POOL_KEEPALIVE,
+    ):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.keepalive = keepalive
+        self._http: Optional["aiohttp.ClientSession"] = None
+        self._groq = None
+
+    async def start(self):
+        """Called from the app lifespan. Pools stay lazy: the first request that needs one opens it."""
+        logger.info(
+            f"HTTP pools configured (max={self.max_connections}, "
+            f"per_host={self.max_per_host}, keepalive={self.keepalive}s; opened on first use)"
+        )
+
+    async def close(self):
+        """Close every pooled client."""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
+        if self._groq is not None:
+            await self._groq.close()
+        self._groq = None
+
+    @property
+    def http(self) -> "aiohttp.ClientSession":
+        """Shared aiohttp session with a keep-alive connector."""
+        if self._http is None or self._http.closed:
+            import aiohttp  # deferred: ~250 ms of import kept off the cold-start path
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                keepalive_timeout=self.keepalive,
+            )
+            self._http = aiohttp.ClientSession(connector=connector)
+        return self._http
+
+    @property
+    def groq(self):
+        """Shared AsyncGroq client backed by a pooled httpx transport."""
+        if self._groq is None:
+            try:
+                import httpx
+                from groq import AsyncGroq
+            except ImportError:
+                raise RuntimeError("groq package not installed. Run: pip install groq")
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_per_host,
+                    keepalive_expiry=self.keepalive,
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+            self._groq = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client)
+        return self._groq
+
+    def stats(self) -> dict:
+        connector = self._http.connector if self._http is not None and not self._http.closed else None
+        return {
+            "http_pool_open": connector is not None,
+            "http_pool_limit": self.max_connections,
+            "http_pool_limit_per_host": self.max_per_host,
+            "groq_client_open": self._groq is not None,
+        }
+
+
+# Singleton instance — started/closed by the app lifespan
+client_registry = ClientRegistry()
@@ -0,0 +1,37 @@
+"""
+Compression helpers — gzip always, brotli when the `brotli` package is installed.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+
+def available_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def precompress(body: bytes, gzip_level: int = 9, brotli_quality: int = 11) -> dict[str, bytes]:
+    """
+    Return {"identity": body, "gzip": ..., "br": ...}, by default with max-effort
+    settings, meant for content compressed once and served many times. Variants
+    that do not shrink the body are omitted.
+    """
+    variants = {"identity": body}
+    if len(body) < MIN_COMPRESS_BYTES:
+        return variants
+
+    gz = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    if len(gz) < len(body):
+        variants["gzip"] = gz
+
+    if brotli is not None:
+        br = brotli.compress(body, quality=brotli_quality)
+        if len(br) < len(body):
+            variants["br"] = br
+    return variants
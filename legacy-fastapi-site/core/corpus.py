@@ -0,0 +1,94 @@
+"""
+Portfolio Corpus — the sources both BM25 indexes are built from
+(static/utils/merge_data.json and the article pages), and the shared
+persist/load plumbing for ai_assistant.retrieval and core.search.
+
+An index is saved to one .npz file together with its per-document payload
+and a fingerprint of the source mtimes; a cold start whose sources are
+unchanged loads that file instead of re-parsing every page.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from core.storage import writable_dir
+
+if TYPE_CHECKING:
+    from core.bm25 import BM25Index  # NumPy-backed; imported on first load/build
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_FILE = BASE_DIR / "static" / "utils" / "merge_data.json"
+ARTICLES_DIR = BASE_DIR / "static" / "articles"
+
+
+def article_files() -> list[Path]:
+    return sorted(ARTICLES_DIR.glob("*.html"))
+
+
+def source_fingerprint() -> dict[str, int]:
+    """{file name: mtime_ns} of every source an index depends on."""
+    return {path.name: path.stat().st_mtime_ns for path in [DATA_FILE, *article_files()] if path.exists()}
+
+
+def read_data() -> dict:
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class PersistedIndex:
+    """
+    Base for a BM25 index over the corpus. Subclasses implement build()
+    (safe to run in a worker thread) and install(); `items` is the
+    JSON-serialisable per-document payload stored next to the index.
+    """
+
+    label = "Index"
+    items_key = "items"
+    unit = "documents"
+
+    def __init__(self, index_path: Path, fallback_name: str):
+        index_path = Path(index_path)
+        self.index_path = writable_dir(index_path.parent, fallback_name) / index_path.name
+        self._index: Optional["BM25Index"] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    def load_or_build(self) -> int:
+        """Load the persisted index if its sources are unchanged, else rebuild and save it."""
+        from core.bm25 import BM25Index
+
+        fingerprint = source_fingerprint()
+        if self.index_path.exists():
+            try:
+                index, meta = BM25Index.load(self.index_path)
+                if meta.get("fingerprint") == fingerprint:
+                    items = meta[self.items_key]
+                    self.install(index, items)
+                    logger.info(f"{self.label} loaded from {self.index_path} ({len(items)} {self.unit})")
+                    return len(items)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable {self.label.lower()} {self.index_path}: {e}")
+
+        index, items = self.build(fingerprint)
+        self.install(index, items)
+        return len(items)
+
+    def build(self, fingerprint: Optional[dict] = None, data: Optional[dict] = None) -> tuple["BM25Index", list]:
+        raise NotImplementedError
+
+    def install(self, index: "BM25Index", items: list):
+        raise NotImplementedError
+
+    def _persist(self, index: "BM25Index", items: list[Any], fingerprint: Optional[dict]):
+        try:
+            index.save(self.index_path, {
+                "fingerprint": fingerprint or source_fingerprint(),
+                self.items_key: items,
+            })
+        except OSError as e:
+            logger.warning(f"Could not persist {self.label.lower()} to {self.index_path}: {e}")
@@ -0,0 +1,109 @@
+"""
+JSON Data Loader — fast parsing of the portfolio data directory.
+Each file is parsed with orjson (if installed) or stdlib json; commentjson's
+pure-Python parser is only used for files that turn out to contain comments.
+The parsed directory is saved as one compact JSON snapshot keyed by file
+mtimes and sizes, so a cold start with unchanged data parses a single file
+with the fast parser instead of every source. Snapshots are plain data (no
+pickle).
+
+Env:
+  DATA_SNAPSHOT_DIR   where snapshots are written  (default .cache/data)
+  DATA_SNAPSHOT       set to 0 to always re-parse
+"""
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from core.storage import writable_dir
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_SNAPSHOT_DIR = Path(os.getenv("DATA_SNAPSHOT_DIR", BASE_DIR / ".cache" / "data"))
+DATA_SNAPSHOT = os.getenv("DATA_SNAPSHOT", "1") not in ("0", "false", "no")
+
+
+def parse_json(raw: bytes) -> Any:
+    """Parse JSON, falling back to commentjson only if the fast parser rejects it."""
+    try:
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError:
+        # orjson.JSONDecodeError and json.JSONDecodeError both subclass ValueError.
+        # commentjson (a Lark grammar) is imported only when a file needs it.
+        import commentjson
+        return commentjson.loads(raw.decode("utf-8"))
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _json_files(data_dir: Path) -> list[Path]:
+    return sorted(path for path in data_dir.iterdir() if path.suffix == ".json" and path.is_file())
+
+
+def _fingerprint(files: list[Path]) -> list[list]:
+    return [[path.name, path.stat().st_mtime_ns, path.stat().st_size] for path in files]
+
+
+class DataLoader:
+
+    def __init__(self, snapshot_dir: Path = DATA_SNAPSHOT_DIR, use_snapshot: bool = DATA_SNAPSHOT):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.use_snapshot = use_snapshot
+        self._resolved_dir: Optional[Path] = None
+        self.snapshot_hits = 0
+        self.parses = 0
+
+    def _snapshot_path(self, data_dir: Path) -> Path:
+        key = hashlib.sha256(str(data_dir.resolve()).encode()).hexdigest()[:16]
+        if self._resolved_dir is None:
+            self._resolved_dir = writable_dir(self.snapshot_dir, "rakibul-data")
+        return self._resolved_dir / f"{key}.json"
+
+    def load_dir(self, data_dir) -> dict[str, Any]:
+        """{file stem: parsed JSON} for every .json file in data_dir."""
+        data_dir = Path(data_dir)
+        files = _json_files(data_dir)
+        fingerprint = _fingerprint(files)
+
+        snapshot = self._snapshot_path(data_dir) if self.use_snapshot else None
+        if snapshot is not None and snapshot.exists():
+            try:
+                saved = _loads(snapshot.read_bytes())
+                if saved["fingerprint"] == fingerprint:
+                    self.snapshot_hits += 1
+                    return saved["data"]
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable data snapshot {snapshot}: {e}")
+
+        data = {path.stem: parse_json(path.read_bytes()) for path in files}
+        self.parses += 1
+
+        if snapshot is not None:
+            try:
+                tmp = snapshot.with_name(f"{snapshot.name}.{os.getpid()}.tmp")
+                tmp.write_bytes(_dumps({"fingerprint": fingerprint, "data": data}))
+                os.replace(tmp, snapshot)
+            except OSError as e:
+                logger.warning(f"Could not write data snapshot {snapshot}: {e}")
+        return data
+
+
+# Singleton instance — used by tools.MyTools.load_data
+data_loader = DataLoader()
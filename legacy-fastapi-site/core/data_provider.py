@@ -0,0 +1,149 @@
+"""
+Data Provider — hot-reloadable portfolio data.
+Holds the parsed contents of static/utils/*.json and polls the directory's
+mtimes and sizes every DATA_POLL_INTERVAL seconds. Changed files are
+re-parsed in a worker thread, and the new dict replaces the old one in a
+single assignment, so readers see either the old data or the new data and
+never a mix.
+
+Subscribers keep derived state (page cache, prompt, retrieval index, ...) in
+step in two phases: `stage(new_data)` runs in the same worker thread as the
+parse and does any expensive rebuilding, then returns a cheap `commit()`
+that is applied on the event loop together with the data swap.
+
+Env:
+  DATA_RELOAD          set to 0 to load once and never poll
+  DATA_POLL_INTERVAL   seconds between mtime checks (default 2)
+"""
+import os
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_RELOAD        = os.getenv("DATA_RELOAD", "1") not in ("0", "false", "no")
+DATA_POLL_INTERVAL = float(os.getenv("DATA_POLL_INTERVAL", "2"))
+
+# stage(new_data) -> optional commit() to run alongside the swap
+Stage = Callable[[dict], Optional[Callable[[], None]]]
+
+
+class DataProvider:
+
+    def __init__(
+        self,
+        data_dir: Path,
+        loader: Callable[[Path], dict[str, Any]],
+        poll_interval: float = DATA_POLL_INTERVAL,
+    ):
+        self.data_dir = Path(data_dir)
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self._data: dict[str, Any] = {}
+        self._fingerprint: Optional[tuple] = None
+        self._subscribers: list[Stage] = []
+        self._task: Optional[asyncio.Task] = None
+        self.version = 0
+        self.failures = 0
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """Current snapshot — read it once per use rather than caching it."""
+        return self._data
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Parsed contents of `<name>.json`."""
+        return self._data.get(name, default)
+
+    def subscribe(self, stage: Stage):
+        """Register `stage(new_data) -> commit | None` for every future reload."""
+        self._subscribers.append(stage)
+
+    def _current_fingerprint(self) -> tuple:
+        return tuple(
+            (path.name, path.stat().st_mtime_ns, path.stat().st_size)
+            for path in sorted(self.data_dir.glob("*.json"))
+        )
+
+    def _load_and_stage(self) -> tuple[dict, list[Callable[[], None]]]:
+        """Parse the directory and run every subscriber's stage. Runs in a worker thread."""
+        data = self.loader(self.data_dir)
+        commits = []
+        for stage in self._subscribers:
+            try:
+                commit = stage(data)
+            except Exception as e:
+                logger.warning(f"Data reload subscriber {getattr(stage, '__name__', stage)} failed: {e}")
+                continue
+            if commit is not None:
+                commits.append(commit)
+        return data, commits
+
+    def _publish(self, data: dict, fingerprint: tuple, commits: list[Callable[[], None]]):
+        # No awaits between the swap and the commits: requests see all-old or all-new
+        self._data = data
+        self._fingerprint = fingerprint
+        self.version += 1
+        for commit in commits:
+            try:
+                commit()
+            except Exception as e:
+                logger.warning(f"Data reload commit failed: {e}")
+
+    def load(self) -> dict[str, Any]:
+        """Blocking load (import time); also brings any subscribers in step."""
+        fingerprint = self._current_fingerprint()
+        data, commits = self._load_and_stage()
+        self._publish(data, fingerprint, commits)
+        return self._data
+
+    async def check(self) -> bool:
+        """Reload if any data file changed. Returns True when new data was swapped in."""
+        fingerprint = await asyncio.to_thread(self._current_fingerprint)
+        if fingerprint == self._fingerprint:
+            return False
+        try:
+            data, commits = await asyncio.to_thread(self._load_and_stage)
+        except Exception as e:
+            # Keep serving the old data; remember this fingerprint so a broken
+            # file is reported once, and retried when it changes again
+            self._fingerprint = fingerprint
+            self.failures += 1
+            logger.error(f"Portfolio data reload failed, keeping version {self.version}: {e}")
+            return False
+        self._publish(data, fingerprint, commits)
+        logger.info(f"Portfolio data reloaded from {self.data_dir} (version {self.version})")
+        return True
+
+    async def _poll_forever(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning(f"Data directory poll failed: {e}")
+
+    def start(self):
+        if not DATA_RELOAD or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._poll_forever())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "portfolio_data": {
+                "version": self.version,
+                "watching": self._task is not None and not self._task.done(),
+                "reload_failures": self.failures,
+            }
+        }
@@ -0,0 +1,186 @@
+"""
+Image Derivatives — resized WebP/AVIF variants of the profile photos.
+Each source under static/images/ is resized to IMAGE_WIDTHS (never upscaled)
+and encoded as WebP and, when Pillow supports it, AVIF. Outputs are cached
+on disk under names keyed by the source's content hash, so unchanged photos
+are never re-encoded. Generation runs in a process pool in the background
+(a thread pool where process pools can't be created, e.g. no /dev/shm on
+Lambda/Vercel); until it finishes, `responsive_img()` falls back to a plain
+<img>.
+"""
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from markupsafe import Markup, escape
+
+from core.storage import writable_dir
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+IMAGES_DIR = BASE_DIR / "static" / "images"
+IMAGE_CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR", BASE_DIR / ".cache" / "images"))
+IMAGE_DERIVATIVES = os.getenv("IMAGE_DERIVATIVES", "1") not in ("0", "false", "no")
+IMAGE_WIDTHS = tuple(int(w) for w in os.getenv("IMAGE_WIDTHS", "320,480,640,960").split(","))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "0")) or None  # None → one per core
+
+SOURCE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+FORMAT_OPTIONS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 6},
+}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+MANIFEST_NAME = "manifest.json"
+
+
+def _supported_formats() -> tuple[str, ...]:
+    from PIL import features
+    # Best compression first: <source> order is the browser's preference order
+    return tuple(fmt for fmt in ("avif", "webp") if features.check(fmt))
+
+
+def _render_derivative(source: str, target: str, width: int, fmt: str) -> str:
+    """Resize + encode one variant. Runs in a worker process."""
+    from PIL import Image
+    with Image.open(source) as image:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        tmp = f"{target}.tmp"
+        resized.save(tmp, format=fmt.upper(), **FORMAT_OPTIONS[fmt])
+    os.replace(tmp, target)
+    return target
+
+
+class ImageDerivatives:
+
+    def __init__(self, source_dir: Path = IMAGES_DIR, cache_dir: Path = IMAGE_CACHE_DIR, url_prefix: str = "/img"):
+        self.source_dir = Path(source_dir)
+        self.cache_dir = writable_dir(cache_dir, "rakibul-images")
+        self.url_prefix = url_prefix
+        # logical name ("images/profile3.png") → {"width": int, "variants": {fmt: {width: filename}}}
+        self.manifest: dict[str, dict] = {}
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+        self._on_ready: list[Callable[[], None]] = []
+
+    def on_ready(self, callback: Callable[[], None]):
+        """Run `callback` once derivatives are available (e.g. invalidate cached pages)."""
+        self._on_ready.append(callback)
+
+    def start(self):
+        """Schedule background generation without blocking startup."""
+        if not IMAGE_DERIVATIVES or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self.generate_all())
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _plan(self) -> tuple[dict, list[tuple[str, str, int, str]]]:
+        """Work out the manifest and which variants still need encoding (runs in a thread)."""
+        from PIL import Image  # deferred: Pillow stays off the cold-start import path
+        formats = _supported_formats()
+        manifest, jobs = {}, []
+        for source in sorted(self.source_dir.iterdir()):
+            if source.suffix.lower() not in SOURCE_SUFFIXES:
+                continue
+            digest = hashlib.sha256(source.read_bytes()).hexdigest()[:12]
+            with Image.open(source) as image:
+                original_width = image.width
+
+            widths = sorted({w for w in IMAGE_WIDTHS if w < original_width} | {original_width})
+            variants: dict[str, dict[int, str]] = {}
+            for fmt in formats:
+                variants[fmt] = {}
+                for width in widths:
+                    name = f"{source.stem}.{digest}.{width}.{fmt}"
+                    variants[fmt][width] = name
+                    if not (self.cache_dir / name).exists():
+                        jobs.append((str(source), str(self.cache_dir / name), width, fmt))
+            manifest[f"images/{source.name}"] = {"width": original_width, "variants": variants}
+        return manifest, jobs
+
+    @staticmethod
+    def _pool() -> Executor:
+        try:
+            return ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Image process pool unavailable ({e}); encoding in threads")
+            return ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-encode")
+
+    async def generate_all(self) -> int:
+        """Encode missing derivatives in parallel across cores. Returns the number encoded."""
+        loop = asyncio.get_running_loop()
+        manifest, jobs = await asyncio.to_thread(self._plan)
+
+        if jobs:
+            logger.info(f"Encoding {len(jobs)} image derivatives in background")
+            pool = self._pool()
+            try:
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(pool, _render_derivative, *job) for job in jobs),
+                    return_exceptions=True,
+                )
+            finally:
+                # Never wait here: on cancel (shutdown) that would block the loop
+                # until the running encodes finish
+                pool.shutdown(wait=False, cancel_futures=True)
+            failed = [(job, r) for job, r in zip(jobs, results) if isinstance(r, Exception)]
+            for (source, target, width, fmt), error in failed:
+                logger.warning(f"Derivative {Path(target).name} failed: {error}")
+                variants = manifest[f"images/{Path(source).name}"]["variants"][fmt]
+                variants.pop(width, None)
+
+        (self.cache_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        self.manifest = manifest
+        self.ready = True
+        for callback in self._on_ready:
+            callback()
+        logger.info(f"Image derivatives ready ({len(manifest)} sources, {len(jobs)} encoded)")
+        return len(jobs)
+
+    def srcset(self, logical: str, fmt: str) -> str:
+        entry = self.manifest.get(logical)
+        if not entry:
+            return ""
+        return ", ".join(
+            f"{self.url_prefix}/{name} {width}w"
+            for width, name in sorted(entry["variants"].get(fmt, {}).items(), key=lambda item: int(item[0]))
+        )
+
+    def picture(self, logical: str, alt: str, fallback_src: str, sizes: str = "100vw", **attrs) -> Markup:
+        """
+        Template helper: <picture> with AVIF/WebP srcsets and an <img> fallback.
+        Extra keyword args become <img> attributes (`class_` → `class`).
+        """
+        img_attrs = "".join(
+            f' {escape(key.rstrip("_").replace("_", "-"))}="{escape(value)}"'
+            for key, value in attrs.items()
+        )
+        img = f'<img src="{escape(fallback_src)}" alt="{escape(alt)}"{img_attrs}>'
+        if not self.ready or logical not in self.manifest:
+            return Markup(img)
+
+        sources = "".join(
+            f'<source type="{MIME_TYPES[fmt]}" srcset="{escape(self.srcset(logical, fmt))}" sizes="{escape(sizes)}">'
+            for fmt in self.manifest[logical]["variants"]
+            if self.manifest[logical]["variants"][fmt]
+        )
+        return Markup(f"<picture>{sources}{img}</picture>")
+
+
+# Singleton instance — started in the app lifespan, exposed to templates as responsive_img()
+image_derivatives = ImageDerivatives()
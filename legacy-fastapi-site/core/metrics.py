@@ -0,0 +1,197 @@
+"""
+Metrics — in-process counters, gauges and histograms in Prometheus text format.
+Every update happens on the event loop thread, so a metric is a plain dict
+of label values → number (or bucket list) with no locks: an increment is a
+dict lookup plus an add. Histograms use fixed buckets and bisect, so
+observe() is O(log buckets). Values are per process; with several workers,
+scrape each one (or aggregate in Prometheus).
+
+MetricsMiddleware times every HTTP request and labels it with the matched
+route template (e.g. /articles/{filename}) rather than the raw path, so
+label cardinality stays bounded. /metrics renders the default registry.
+
+Env:
+  METRICS_ENABLED   set to 0 to skip the middleware and hide /metrics
+"""
+import os
+import time
+from bisect import bisect_left
+from typing import Awaitable, Callable, Iterable, Optional
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "no")
+
+# Seconds. HTTP requests are mostly sub-10 ms; LLM calls take seconds.
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: dict = {}
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels):
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple = HTTP_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        state = self._values.get(labels)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), state):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(state[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Awaitable[None]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing  # module reloads re-declare the same metric
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple = HTTP_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]):
+        """Async callback run before each scrape, to refresh gauges from other components."""
+        self._collectors.append(collector)
+
+    async def render(self) -> str:
+        for collector in self._collectors:
+            await collector()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request latency histogram by method, route and status."""
+
+    def __init__(self, app, registry: Optional["MetricsRegistry"] = None):
+        self.app = app
+        registry = registry or metrics
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency (until the last body byte)",
+            ("method", "route", "status"),
+        )
+        self.in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+        self._active = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        start = time.perf_counter()
+        self._active += 1
+        self.in_flight.set(self._active)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._active -= 1
+            self.in_flight.set(self._active)
+            self.latency.observe(time.perf_counter() - start, scope["method"], self._route(scope), status)
+
+    @staticmethod
+    def _route(scope) -> str:
+        """Route template for labels; never the raw path (unbounded cardinality)."""
+        # The router records the matched route on the shared scope
+        route = getattr(scope.get("route"), "path", None)
+        if route:
+            return route
+        if "endpoint" in scope:
+            # Mounted apps (static files) only leave their prefix in root_path
+            prefix = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+            if prefix:
+                return f"{prefix}/{{path}}"
+        return "unmatched"
+
+
+# Singleton instance — shared by the middleware, agent.py and the /metrics route
+metrics = MetricsRegistry()
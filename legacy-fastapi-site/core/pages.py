@@ -0,0 +1,135 @@
+"""
+Page Cache — whole pages rendered once and served as pre-encoded bytes.
+A page is re-rendered only when one of its source files (templates, data)
+changes; the mtime check runs at most once per PAGE_CHECK_INTERVAL seconds.
+Each render keeps identity/gzip/br variants with strong per-encoding ETags.
+
+Rendering and compressing take ~200 ms at max effort, so they never run on
+the event loop: builds happen in a worker thread, and while a rebuild after a
+change is running, requests keep getting the previous (stale) page. Only the
+very first request, with nothing to serve yet, waits for a build. Builds on
+demand use cheaper compression settings; warm() re-encodes the page at max
+effort in the background afterwards.
+
+Env:
+  PAGE_CHECK_INTERVAL         seconds between source mtime checks (default 2)
+  PAGE_RUNTIME_GZIP_LEVEL     gzip level for runtime rebuilds      (default 6)
+  PAGE_RUNTIME_BROTLI_QUALITY brotli quality for runtime rebuilds  (default 5)
+"""
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from core.compression import precompress
+
+logger = logging.getLogger(__name__)
+
+PAGE_CHECK_INTERVAL         = float(os.getenv("PAGE_CHECK_INTERVAL", "2"))
+PAGE_RUNTIME_GZIP_LEVEL     = int(os.getenv("PAGE_RUNTIME_GZIP_LEVEL", "6"))
+PAGE_RUNTIME_BROTLI_QUALITY = int(os.getenv("PAGE_RUNTIME_BROTLI_QUALITY", "5"))
+
+
+class PageVariant(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class RenderedPage(NamedTuple):
+    variants: dict[str, PageVariant]
+    etags: frozenset
+
+
+class PageCache:
+    """Caches the output of `render` until a file under `sources` changes."""
+
+    def __init__(self, name: str, render: Callable[[], str], sources: Callable[[], Iterable[Path]]):
+        self.name = name
+        self._render = render
+        self._sources = sources
+        self._page: Optional[RenderedPage] = None
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at = 0.0
+        # Bumped by invalidate(); a build only clears staleness for the generation it started in
+        self._generation = 0
+        self._stale = False
+        self._rebuild: Optional[asyncio.Task] = None
+        self.renders = 0
+        self.stale_served = 0
+
+    def _current_fingerprint(self) -> tuple:
+        return tuple(sorted(
+            (str(path), path.stat().st_mtime_ns)
+            for path in self._sources()
+            if path.is_file()
+        ))
+
+    def invalidate(self):
+        """Force a re-render; the current page keeps being served until it is ready."""
+        self._generation += 1
+        self._stale = True
+
+    async def get(self) -> RenderedPage:
+        now = time.monotonic()
+        if self._page is not None and not self._stale and now - self._checked_at < PAGE_CHECK_INTERVAL:
+            return self._page
+
+        self._checked_at = now
+        if self._page is not None and not self._stale:
+            fingerprint = self._current_fingerprint()
+            if fingerprint == self._fingerprint:
+                return self._page
+            self._stale = True
+
+        if self._rebuild is None or self._rebuild.done():
+            self._rebuild = asyncio.ensure_future(self._refresh(max_effort=False))
+        if self._page is None:
+            await asyncio.shield(self._rebuild)
+            return self._page
+        self.stale_served += 1
+        return self._page
+
+    async def warm(self):
+        """Make sure a page exists (cheap settings), then re-encode it at max compression."""
+        if self._page is None:
+            await self.get()
+        if self._rebuild is not None and not self._rebuild.done():
+            await asyncio.shield(self._rebuild)
+        self._rebuild = asyncio.ensure_future(self._refresh(max_effort=True))
+        await asyncio.shield(self._rebuild)
+
+    async def _refresh(self, max_effort: bool):
+        generation = self._generation
+        try:
+            page, fingerprint = await asyncio.to_thread(self._build, max_effort)
+        except Exception as e:
+            if self._page is None:
+                raise
+            logger.error(f"Re-rendering page {self.name} failed, serving the previous version: {e}")
+            return
+        self._page, self._fingerprint = page, fingerprint
+        if generation == self._generation:
+            self._stale = False
+
+    def _build(self, max_effort: bool) -> tuple[RenderedPage, tuple]:
+        # Fingerprint first: an edit during the render then shows up as a change next check
+        fingerprint = self._current_fingerprint()
+        body = self._render().encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        encoded = (
+            precompress(body) if max_effort
+            else precompress(body, PAGE_RUNTIME_GZIP_LEVEL, PAGE_RUNTIME_BROTLI_QUALITY)
+        )
+        variants = {
+            encoding: PageVariant(data, f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"')
+            for encoding, data in encoded.items()
+        }
+        self.renders += 1
+        logger.info(
+            f"Rendered page {self.name}: "
+            + ", ".join(f"{enc}={len(v.body)}B" for enc, v in variants.items())
+        )
+        return RenderedPage(variants, frozenset(v.etag for v in variants.values())), fingerprint
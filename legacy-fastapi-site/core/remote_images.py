@@ -0,0 +1,143 @@
+"""
+Remote Image Fetcher — bounded, cached downloads of images by URL.
+Bodies are streamed over the shared client_registry pool and the download is
+aborted as soon as it exceeds IMAGE_FETCH_MAX_BYTES. Decoding happens in a
+small thread pool (JPEGs are downscaled while decoding via Image.draft), and
+decoded thumbnails are kept in an LRU keyed by the body's content hash, so
+the same picture behind different URLs is decoded once.
+
+Env:
+  IMAGE_FETCH_MAX_BYTES     largest body accepted            (default 10 MiB)
+  IMAGE_FETCH_MAX_SIDE      thumbnail bounding box, px       (default 1000)
+  IMAGE_FETCH_CACHE_SIZE    decoded thumbnails kept          (default 64)
+  IMAGE_FETCH_CONCURRENCY   parallel downloads in fetch_many (default 8)
+  IMAGE_DECODE_WORKERS      decoder threads                  (default 4)
+"""
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import TYPE_CHECKING, Optional
+
+from core.clients import client_registry
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FETCH_MAX_BYTES   = int(os.getenv("IMAGE_FETCH_MAX_BYTES", str(10 * 1024 * 1024)))
+IMAGE_FETCH_MAX_SIDE    = int(os.getenv("IMAGE_FETCH_MAX_SIDE", "1000"))
+IMAGE_FETCH_CACHE_SIZE  = int(os.getenv("IMAGE_FETCH_CACHE_SIZE", "64"))
+IMAGE_FETCH_CONCURRENCY = int(os.getenv("IMAGE_FETCH_CONCURRENCY", "8"))
+IMAGE_DECODE_WORKERS    = int(os.getenv("IMAGE_DECODE_WORKERS", "4"))
+
+# Bytes read from the socket per iteration
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageTooLargeError(ValueError):
+    """The remote body is larger than the configured byte cap."""
+
+
+def _decode_thumbnail(body: bytes, max_side: int) -> "Image.Image":
+    """Decode and shrink to fit max_side × max_side. Runs in a decoder thread."""
+    from PIL import Image  # deferred: Pillow stays off the cold-start import path
+
+    image = Image.open(BytesIO(body))
+    if image.format == "JPEG":
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale instead of full size
+        image.draft("RGB", (max_side, max_side))
+    image.thumbnail((max_side, max_side))
+    image.load()
+    return image
+
+
+class RemoteImageFetcher:
+
+    def __init__(
+        self,
+        max_bytes: int = IMAGE_FETCH_MAX_BYTES,
+        max_side: int = IMAGE_FETCH_MAX_SIDE,
+        cache_size: int = IMAGE_FETCH_CACHE_SIZE,
+        concurrency: int = IMAGE_FETCH_CONCURRENCY,
+        decode_workers: int = IMAGE_DECODE_WORKERS,
+    ):
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.cache_size = cache_size
+        self.concurrency = concurrency
+        self._decoder = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="image-decode")
+        self._cache: OrderedDict[str, "Image.Image"] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.aborted = 0
+
+    async def _download(self, url: str) -> bytes:
+        async with client_registry.http.get(url) as response:
+            response.raise_for_status()
+            if response.content_length is not None and response.content_length > self.max_bytes:
+                self.aborted += 1
+                raise ImageTooLargeError(f"{response.content_length} bytes exceeds cap of {self.max_bytes}")
+
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                buffer.extend(chunk)
+                if len(buffer) > self.max_bytes:
+                    # Closing the response drops the connection mid-body
+                    self.aborted += 1
+                    raise ImageTooLargeError(f"body exceeds cap of {self.max_bytes} bytes")
+            return bytes(buffer)
+
+    async def fetch(self, url: str, max_side: Optional[int] = None) -> "Image.Image":
+        """Thumbnail of the image at `url`. Raises on HTTP, size or decode errors."""
+        max_side = max_side or self.max_side
+        body = await self._download(url)
+        key = f"{hashlib.sha256(body).hexdigest()}:{max_side}"
+
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            loop = asyncio.get_running_loop()
+            image = await loop.run_in_executor(self._decoder, _decode_thumbnail, body, max_side)
+            self._cache[key] = image
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        # Callers may draw on or resize the result; keep the cached copy pristine
+        return image.copy()
+
+    async def fetch_many(
+        self, urls: list[str], max_side: Optional[int] = None, concurrency: Optional[int] = None
+    ) -> list[Optional["Image.Image"]]:
+        """Fetch many URLs with at most `concurrency` in flight. Failed URLs yield None, in order."""
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def bounded(url: str) -> Optional["Image.Image"]:
+            async with semaphore:
+                try:
+                    return await self.fetch(url, max_side)
+                except Exception as e:
+                    logger.warning(f"Image fetch failed for {url}: {e}")
+                    return None
+
+        return await asyncio.gather(*(bounded(url) for url in urls))
+
+    def stats(self) -> dict:
+        return {
+            "remote_images": {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "aborted_oversize": self.aborted,
+            }
+        }
+
+
+# Singleton instance — used by tools.MyTools
+remote_image_fetcher = RemoteImageFetcher()
@@ -0,0 +1,180 @@
+"""
+Article Search — full-text search over static/articles/ for /api/search.
+Each article is one document: its tag-stripped text plus the title,
+description and category from merge_data.json (title and description are
+repeated so they outweigh body text). Documents are indexed with
+core.bm25 (CSR postings, precomputed BM25 weights), so a query costs a few
+vectorised scatter-adds over the postings of its terms. Snippets come from
+the text block with the most query terms and are HTML-escaped, with
+matches wrapped in <mark>.
+
+The index and the article text it needs for snippets are persisted to one
+.npz file keyed by the source mtimes, so a cold start loads it instead of
+re-parsing every page (see core.corpus). The index is loaded by the
+startup warm-up in a worker thread; until then /api/search answers 503.
+
+Env:
+  SEARCH_INDEX_PATH   where the index is persisted (default .cache/search_index.npz)
+"""
+import os
+import re
+import time
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from markupsafe import Markup, escape
+
+from core.corpus import BASE_DIR, PersistedIndex, article_files, read_data
+from core.text import extract_html_text, tokenize
+
+if TYPE_CHECKING:
+    from core.bm25 import BM25Index  # NumPy-backed; imported on first load/build
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_PATH = Path(os.getenv("SEARCH_INDEX_PATH", BASE_DIR / ".cache" / "search_index.npz"))
+
+SNIPPET_WORDS = 30
+# Title and description tokens are repeated this many times in the document
+FIELD_BOOST = 3
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+def _document(path: Path, listing: dict) -> tuple[dict, list[str]]:
+    """(result metadata, tokens) for one article page."""
+    page = extract_html_text(path.read_text(encoding="utf-8"))
+    title = listing.get("title") or page.title or path.stem
+    description = listing.get("description", "")
+    doc = {
+        "title": title,
+        "url": f"/static/articles/{path.name}",
+        "category": listing.get("category", ""),
+        "read_time": listing.get("read_time", ""),
+        "description": description,
+        "blocks": page.blocks,
+    }
+    tokens = tokenize(" ".join(page.blocks)) + tokenize(f"{title} {description}") * FIELD_BOOST
+    tokens += tokenize(doc["category"])
+    return doc, tokens
+
+
+def highlight(text: str, terms: set[str], words: int = SNIPPET_WORDS) -> str:
+    """
+    Up to `words` words of `text` around its first query-term match, escaped,
+    with every match wrapped in <mark>. Ellipses mark trimmed ends.
+    """
+    matches = list(_WORD_RE.finditer(text))
+    if not matches:
+        return str(escape(text))
+    first = next((i for i, m in enumerate(matches) if m.group().lower() in terms), 0)
+    start = max(0, min(first - words // 3, len(matches) - words))
+    end = min(len(matches), start + words)
+
+    begin = matches[start].start() if start else 0
+    finish = matches[end].start() if end < len(matches) else len(text)
+    parts = ["…"] if start else []
+    position = begin
+    for match in matches[start:end]:
+        if match.group().lower() in terms:
+            parts.append(escape(text[position:match.start()]))
+            parts.append(Markup("<mark>%s</mark>") % match.group())
+            position = match.end()
+    parts.append(escape(text[position:finish].rstrip()))
+    if end < len(matches):
+        parts.append("…")
+    return "".join(str(part) for part in parts)
+
+
+class ArticleSearch(PersistedIndex):
+    """BM25 search over the article pages; built or loaded once, then queried in-process."""
+
+    label = "Search index"
+    items_key = "docs"
+    unit = "articles"
+
+    def __init__(self, index_path: Path = SEARCH_INDEX_PATH):
+        super().__init__(index_path, "rakibul-search")
+        self._docs: list[dict] = []
+        # Per document, the token set of each text block (for picking snippets)
+        self._block_terms: list[list[frozenset]] = []
+        self.queries = 0
+
+    def build(self, fingerprint: Optional[dict] = None, data: Optional[dict] = None) -> tuple["BM25Index", list[dict]]:
+        """
+        Build (and persist) an index without touching the live one — safe to run
+        in a worker thread. `data` is already-parsed merge_data (e.g. from a hot
+        reload); install() the result to start serving it.
+        """
+        from core.bm25 import BM25Index
+
+        if data is None:
+            data = read_data()
+        listings = {article["url"]: article for article in data.get("articles", [])}
+
+        docs, tokens = [], []
+        for path in article_files():
+            doc, doc_tokens = _document(path, listings.get(path.name, {}))
+            docs.append(doc)
+            tokens.append(doc_tokens)
+
+        index = BM25Index.build(tokens)
+        logger.info(f"Search index built ({len(docs)} articles, {len(index.vocab)} terms)")
+        self._persist(index, docs, fingerprint)
+        return index, docs
+
+    def install(self, index: "BM25Index", docs: list[dict]):
+        block_terms = [[frozenset(tokenize(block)) for block in doc["blocks"]] for doc in docs]
+        self._index, self._docs, self._block_terms = index, docs, block_terms
+
+    def _snippet(self, doc_id: int, terms: set[str]) -> str:
+        doc = self._docs[doc_id]
+        best, best_hits = None, 0
+        for block, block_terms in zip(doc["blocks"], self._block_terms[doc_id]):
+            hits = len(terms & block_terms)
+            if hits > best_hits:
+                best, best_hits = block, hits
+        if best is None:
+            # Matched on title/description only
+            return highlight(doc["description"] or (doc["blocks"][0] if doc["blocks"] else ""), terms)
+        return highlight(best, terms)
+
+    def search(self, query: str, limit: int = 5) -> dict:
+        """
+        Ranked articles for `query`, each with a highlighted snippet. The
+        index must be installed first (check `ready`): building it here would
+        block the event loop.
+        """
+        start = time.perf_counter()
+        self.queries += 1
+        terms = tokenize(query)
+        results = []
+        for doc_id, score in self._index.search(terms, limit) if terms else []:
+            doc = self._docs[doc_id]
+            results.append({
+                "title": doc["title"],
+                "url": doc["url"],
+                "category": doc["category"],
+                "read_time": doc["read_time"],
+                "score": round(score, 4),
+                "snippet": self._snippet(doc_id, set(terms)),
+            })
+        return {
+            "query": query,
+            "results": results,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "search": {
+                "articles": len(self._docs),
+                "terms": len(self._index.vocab) if self._index is not None else 0,
+                "queries": self.queries,
+            }
+        }
+
+
+# Singleton instance — loaded in the app lifespan, queried by /api/search
+article_search = ArticleSearch()
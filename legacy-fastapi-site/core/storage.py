@@ -0,0 +1,57 @@
+"""
+Storage helpers — where on-disk caches may be written.
+
+Caches (assets, indexes, snapshots, the session journal) are trusted when
+read back, so the /tmp fallback must be private: a per-user directory
+`<tmp>/<name>-<uid>`, mode 0700, used only if this user owns it and nobody
+else can write to it. A squatted or loosened one is never reused; a fresh
+mkdtemp directory is used instead.
+"""
+import os
+import stat
+import logging
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _is_private(path: Path) -> bool:
+    # lstat: a symlink planted under that name is refused, not followed
+    st = os.lstat(path)
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def writable_dir(path: Path, fallback_name: str) -> Path:
+    """
+    `path` if it can be created and written, else a private directory under
+    <tmp> (read-only serverless deploys only allow writes under /tmp).
+    """
+    path = Path(path)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+        if os.access(path, os.W_OK):
+            return path
+    except OSError:
+        pass
+
+    tmp = Path(tempfile.gettempdir())
+    if not hasattr(os, "getuid"):  # Windows: the temp dir is already per user
+        fallback = tmp / fallback_name
+        fallback.mkdir(parents=True, exist_ok=True)
+    else:
+        fallback = tmp / f"{fallback_name}-{os.getuid()}"
+        try:
+            fallback.mkdir(mode=0o700)
+        except FileExistsError:
+            pass
+        if not _is_private(fallback):
+            private = Path(tempfile.mkdtemp(prefix=f"{fallback_name}-"))
+            logger.warning(f"{fallback} is not private to this user; using {private}")
+            return private
+    logger.warning(f"{path} is not writable; using {fallback}")
+    return fallback
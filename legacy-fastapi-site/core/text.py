@@ -0,0 +1,89 @@
+"""
+Text utilities — tag stripping and tokenisation shared by the retrieval and
+search indexes.
+"""
+import re
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have he his how i if in "
+    "into is it its me my no not of on or our so that the their them then there "
+    "these they this to was we what when where which who why will with you your".split()
+)
+
+_SKIP_TAGS = {"script", "style", "nav", "header", "footer", "noscript", "svg", "head"}
+_BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "td", "div", "section", "article"}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+
+
+class ExtractedHTML(NamedTuple):
+    title: str
+    blocks: list[str]
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: list[str] = []
+        self.title = ""
+        self._current: list[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._in_main = False
+        self._saw_main = False
+        self._main_blocks: list[str] = []
+
+    def _flush(self):
+        text = " ".join("".join(self._current).split())
+        if text:
+            (self._main_blocks if self._in_main else self.blocks).append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag == "main":
+            self._flush()
+            self._in_main = self._saw_main = True
+        elif tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "main":
+            self._flush()
+            self._in_main = False
+        elif tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._current.append(data)
+
+
+def extract_html_text(html: str) -> ExtractedHTML:
+    """
+    Strip tags from an HTML page, returning its <title> and text blocks
+    (paragraphs, headings, list items). Navigation, headers, footers and
+    scripts are dropped; if the page has a <main>, only its content is kept.
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    parser._flush()
+    blocks = parser._main_blocks if parser._saw_main else parser.blocks
+    return ExtractedHTML(" ".join(parser.title.split()), blocks)
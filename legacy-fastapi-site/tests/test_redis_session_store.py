@@ -0,0 +1,100 @@
+"""RedisSessionStore against an in-process fakeredis server."""
+import json
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from ai_assistant.redis_session_store import RedisSessionStore
+
+
+def _store(**kwargs) -> RedisSessionStore:
+    return RedisSessionStore(fakeredis.FakeAsyncRedis(decode_responses=True), **kwargs)
+
+
+def test_create_and_append():
+    async def scenario():
+        store = _store()
+        session_id = await store.create_session()
+        assert await store.session_exists(session_id)
+        assert await store.get_history(session_id) == []
+
+        assert await store.add_message(session_id, "user", "hello")
+        assert await store.add_message(session_id, "assistant", "hi there")
+        assert await store.get_history(session_id) == [
+            {"role": "user", "content": "hello"},
+            {"role": "assistant", "content": "hi there"},
+        ]
+        meta = await store._redis.hgetall(store._meta_key(session_id))
+        assert meta["message_count"] == "2"
+        assert (await store.stats())["active_sessions"] == 1
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_trims_oldest_pair_past_max_messages():
+    async def scenario():
+        store = _store(max_messages=4)
+        session_id = await store.create_session()
+        for turn in range(3):
+            await store.add_message(session_id, "user", f"question {turn}")
+            await store.add_message(session_id, "assistant", f"answer {turn}")
+
+        history = await store.get_history(session_id)
+        assert [message["content"] for message in history] == [
+            "question 1", "answer 1", "question 2", "answer 2",
+        ]
+        # The running token total follows the trim
+        stored = await store._redis.lrange(store._messages_key(session_id), 0, -1)
+        history_tokens = await store._redis.hget(store._meta_key(session_id), "history_tokens")
+        assert int(history_tokens) == sum(json.loads(item)["tokens"] for item in stored)
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_trims_to_token_budget_but_keeps_last_two():
+    async def scenario():
+        store = _store(token_budget=1)
+        session_id = await store.create_session()
+        for turn in range(3):
+            await store.add_message(session_id, "user", f"question {turn}")
+            await store.add_message(session_id, "assistant", f"answer {turn}")
+
+        history = await store.get_history(session_id)
+        assert [message["content"] for message in history] == ["question 2", "answer 2"]
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_evicts_least_recently_active():
+    async def scenario():
+        store = _store(max_sessions=2)
+        first = await store.create_session()
+        second = await store.create_session()
+        # Touch the first session so the second becomes least recently active
+        await asyncio.sleep(0.01)
+        await store.add_message(first, "user", "still here")
+
+        third = await store.create_session()
+        assert await store.session_exists(first)
+        assert not await store.session_exists(second)
+        assert await store.session_exists(third)
+        assert (await store.stats())["active_sessions"] == 2
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_missing_session():
+    async def scenario():
+        store = _store()
+        assert not await store.session_exists("no-such-session")
+        assert await store.add_message("no-such-session", "user", "hello") is False
+        assert await store.get_history("no-such-session") == []
+        await store.close()
+
+    asyncio.run(scenario())
@@ -1,16 +1,13 @@
-import os
 import json
-import commentjson
 import traceback
 from datetime import datetime
-from aiohttp import ClientSession
-from PIL import Image
-from io import BytesIO
 
-import concurrent.futures
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from core.data_loader import data_loader
+from core.remote_images import remote_image_fetcher
+
 
 class MyTools:
 
@@ -25,39 +22,32 @@ class MyTools:
 
     # Json Data Load Function
     def load_data(self, data_dir):
-        json_data = {}
-        def load_file(file): # helper function to read and load all json files in the target dir
-            file_name = os.path.splitext(file)[0]
-            file_path = os.path.join(data_dir, file)
-            with open(file_path, "r", encoding="utf-8") as data:
-                # return file_name, json.load(data)
-                return file_name, commentjson.load(data)
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            json_data.update(dict(executor.map(load_file, [f for f in os.listdir(data_dir) if f.endswith(".json")])))
-        return json_data
+        # json/orjson first (commentjson only for files with comments), snapshot-cached by mtime
+        return data_loader.load_dir(data_dir)
 
 
 
     # Get Image Data for Checking Quality and start detection
     async def get_image_data_main(self, img_url, padding=100):
         try:
-            async with ClientSession() as session:
-                async with session.get(img_url) as response:
-                    response.raise_for_status()
-                    image = Image.open(BytesIO(await response.read()))
-                    # image.thumbnail((1000, 1000))
-
-                    # Add padding
-                    # padded_image = ImageOps.expand(image, border=padding, fill='black')
-                    # return padded_image
-                    return image
+            # Streamed with a byte cap, decoded off the loop, cached by content hash
+            image = await remote_image_fetcher.fetch(img_url)
+
+            # Add padding
+            # padded_image = ImageOps.expand(image, border=padding, fill='black')
+            # return padded_image
+            return image
         except Exception as e:
             traceback.print_exc()
             # return None
             raise ValueError(f"Invalid URL ==>>{img_url}<<== : {str(e)}")
 
 
+    # Fetch many images concurrently (None for any URL that failed)
+    async def get_images_main(self, img_urls, concurrency=None):
+        return await remote_image_fetcher.fetch_many(img_urls, concurrency=concurrency)
+
+
 
     def formatTime(self, record, datefmt=None):
         dt = datetime.fromtimestamp(record.created, ZoneInfo("Asia/Dhaka"))